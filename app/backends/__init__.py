@@ -0,0 +1,32 @@
+"""
+Query backends behind run_query, selected with QUERY_BACKEND:
+"sql" (default, the SQLAlchemy database) or "duckdb" (Parquet snapshot).
+"""
+import os
+import logging
+
+from app.backends.base import QueryBackend
+
+logger = logging.getLogger(__name__)
+
+QUERY_BACKEND = os.getenv("QUERY_BACKEND", "sql").lower()
+
+def create_backend(name: str = QUERY_BACKEND) -> QueryBackend:
+    """Builds the backend registered under `name`."""
+    if name == "sql":
+        from app.backends.sql import SQLBackend
+        return SQLBackend()
+    if name == "duckdb":
+        from app.backends.duckdb_backend import DuckDBBackend
+        return DuckDBBackend()
+    raise ValueError(f"Unknown QUERY_BACKEND '{name}', expected 'sql' or 'duckdb'")
+
+_backend: QueryBackend = None
+
+def get_backend() -> QueryBackend:
+    """Returns the process-wide backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+        logger.info(f"Using query backend: {_backend.name}")
+    return _backend
@@ -0,0 +1,63 @@
+import os
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Caps on one result: rows, and approximate serialized size in bytes
+MAX_QUERY_RESULTS = int(os.getenv("MAX_QUERY_RESULTS", "10000"))
+MAX_RESULT_BYTES = int(os.getenv("MAX_RESULT_BYTES", str(8 * 1024 * 1024)))
+FETCH_BATCH_SIZE = 500
+
+class QueryTimeout(Exception):
+    """Raised when a query runs past its time limit and is interrupted."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Query exceeded its {timeout:g}s time limit")
+        self.timeout = timeout
+
+class QueryBackend:
+    """
+    Read-only engine that executes the SELECT queries behind run_query.
+    Implementations return (columns, rows, served_by, truncated_by),
+    reading rows through limit_rows, and interrupt the query with
+    QueryTimeout once `timeout` seconds have passed.
+    """
+
+    name = "base"
+
+    def prepare(self):
+        """Called once the data is loaded, before serving queries."""
+
+    def refresh(self):
+        """Called when the loaded data was replaced (hot reload)."""
+        self.prepare()
+
+    def execute(self, sql: str, timeout: Optional[float] = None) -> Tuple[List[str], List[list], str, Optional[str]]:
+        raise NotImplementedError
+
+    def close(self):
+        """Releases connections held by the backend."""
+
+def iter_fetchmany(fetchmany: Callable[[int], List[Any]]) -> Iterator[Any]:
+    """Yields the rows of a cursor/result, fetching them in batches."""
+    while True:
+        batch = fetchmany(FETCH_BATCH_SIZE)
+        if not batch:
+            return
+        yield from batch
+
+def limit_rows(rows: Iterable[Any], max_rows: int = MAX_QUERY_RESULTS,
+               max_bytes: int = MAX_RESULT_BYTES) -> Tuple[List[list], Optional[str]]:
+    """
+    Collects rows as lists until `max_rows` or roughly `max_bytes` of
+    JSON is reached, without reading further. Returns the rows and the
+    cap that cut them short ("rows", "bytes" or None).
+    """
+    collected, size = [], 0
+    for row in rows:
+        if len(collected) >= max_rows:
+            return collected, "rows"
+        row = list(row)
+        size += sum(len(str(value)) + 4 for value in row)
+        if size > max_bytes:
+            return collected, "bytes"
+        collected.append(row)
+    return collected, None
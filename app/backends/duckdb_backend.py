@@ -0,0 +1,158 @@
+"""
+Embedded DuckDB backend over a Parquet snapshot of the loaded data.
+The snapshot is exported from the SQL database after loading, tagged
+with the data version it holds, and exported again whenever the data
+version moves on; DuckDB reads it into memory and then runs with file
+access disabled.
+"""
+import os
+import queue
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.backends.base import QueryBackend, QueryTimeout, iter_fetchmany, limit_rows
+from app.services.sql_dialect import sqlite_column_names, translate_sql
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DUCKDB_SNAPSHOT_DIR = os.getenv("DUCKDB_SNAPSHOT_DIR", "./snapshot")
+# Cursors shared by the query threads (one query at a time each)
+DUCKDB_CURSORS = int(os.getenv("DUCKDB_CURSORS", os.getenv("QUERY_WORKERS", "8")))
+
+# Tables exported to the snapshot (the same names the LLM queries)
+SNAPSHOT_TABLES = {
+    "sales": "SELECT * FROM sales",
+    "tickets": "SELECT * FROM tickets",
+}
+# Sidecar file holding the data version the Parquet files were exported at
+VERSION_FILE = "data_version"
+
+def export_parquet_snapshot(engine, directory: str = DUCKDB_SNAPSHOT_DIR):
+    """
+    Writes one Parquet file per snapshot table. Files are written next to
+    their final name and renamed, so concurrent workers never read a
+    partial file. The data version is read first and written last: a
+    load committed during the export leaves the snapshot marked older
+    than it may be, and the next prepare() exports it again.
+    """
+    from app.database import get_data_version
+    os.makedirs(directory, exist_ok=True)
+    with engine.connect() as conn:
+        version = get_data_version(conn)
+    exporter = duckdb.connect(":memory:")
+    try:
+        for table, sql in SNAPSHOT_TABLES.items():
+            with engine.connect() as conn:
+                frame = pd.read_sql_query(text(sql), conn)
+            exporter.register("frame", frame)
+            path = os.path.join(directory, f"{table}.parquet")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            exporter.execute(f"COPY (SELECT * FROM frame) TO '{tmp_path}' (FORMAT PARQUET)")
+            exporter.unregister("frame")
+            os.replace(tmp_path, path)
+    finally:
+        exporter.close()
+    version_path = os.path.join(directory, VERSION_FILE)
+    with open(f"{version_path}.{os.getpid()}.tmp", "w") as file:
+        file.write(str(version))
+    os.replace(f"{version_path}.{os.getpid()}.tmp", version_path)
+    logger.info(f"Exported Parquet snapshot of data version {version} to {directory}")
+
+def snapshot_version(directory: str = DUCKDB_SNAPSHOT_DIR) -> Optional[int]:
+    """Data version of the exported snapshot (None when missing or incomplete)."""
+    paths = [os.path.join(directory, f"{table}.parquet") for table in SNAPSHOT_TABLES]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    try:
+        with open(os.path.join(directory, VERSION_FILE)) as file:
+            return int(file.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+class DuckDBBackend(QueryBackend):
+    """
+    Runs queries on an in-memory DuckDB database loaded from the snapshot.
+    Read-only is enforced by DuckDB itself: only a single SELECT statement
+    is accepted (checked with DuckDB's parser) and external file access is
+    disabled and locked after loading. Queries are written for SQLite:
+    they are translated (sql_dialect), run with SQLite's integer division,
+    and answered under the column names SQLite would report.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, directory: str = DUCKDB_SNAPSHOT_DIR):
+        if not DUCKDB_AVAILABLE:
+            raise RuntimeError("QUERY_BACKEND=duckdb requires the duckdb package")
+        self.directory = directory
+        self.connection = None
+        self._cursors: queue.Queue = queue.Queue()
+
+    def prepare(self):
+        """Exports the snapshot unless it holds the current data version, then loads it."""
+        from app.database import get_data_version, read_engine
+        with read_engine.connect() as conn:
+            version = get_data_version(conn)
+        if snapshot_version(self.directory) != version:
+            export_parquet_snapshot(read_engine, self.directory)
+        self.load()
+
+    def load(self):
+        """Loads the Parquet files and locks the connection down."""
+        connection = duckdb.connect(":memory:")
+        for table in SNAPSHOT_TABLES:
+            path = os.path.join(self.directory, f"{table}.parquet")
+            connection.execute(f"CREATE TABLE {table} AS SELECT * FROM read_parquet('{path}')")
+        # Each cursor is a session of its own, and session settings can
+        # no longer change once the configuration is locked
+        cursors: queue.Queue = queue.Queue()
+        for _ in range(max(1, DUCKDB_CURSORS)):
+            cursor = connection.cursor()
+            cursor.execute("SET integer_division = true")  # 7 / 2 = 3, as in SQLite
+            cursors.put(cursor)
+        connection.execute("SET enable_external_access = false")
+        connection.execute("SET lock_configuration = true")
+        self.connection = connection
+        self._cursors = cursors
+        logger.info(f"DuckDB backend loaded snapshot from {self.directory}")
+
+    def execute(self, sql: str, timeout: Optional[float] = None) -> Tuple[List[str], List[list], str, Optional[str]]:
+        # DuckDB connections are not thread-safe: a cursor serves one query at a time
+        cursors = self._cursors
+        cursor = cursors.get()
+        timer = threading.Timer(timeout, cursor.interrupt) if timeout else None
+        try:
+            translated = translate_sql(sql, "duckdb")
+            statements = cursor.extract_statements(translated)
+            if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                raise ValueError("Only a single SELECT statement is allowed")
+            if timer:
+                timer.start()
+            cursor.execute(translated)
+            columns = [column[0] for column in cursor.description]
+            names = sqlite_column_names(sql)
+            if names and len(names) == len(columns):
+                columns = names
+            rows, truncated_by = limit_rows(iter_fetchmany(cursor.fetchmany))
+            return columns, rows, self.name, truncated_by
+        except duckdb.InterruptException as e:
+            raise QueryTimeout(timeout) from e
+        finally:
+            if timer:
+                timer.cancel()
+            cursors.put(cursor)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,75 @@
+import time
+import logging
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.backends.base import QueryBackend, QueryTimeout, iter_fetchmany, limit_rows
+from app.database import get_read_session
+from app.replica import get_replica_session
+from app.services.rollups import rewrite_query
+from app.services.sql_dialect import translate_sql
+
+logger = logging.getLogger(__name__)
+
+# SQLite VM instructions between deadline checks
+PROGRESS_STEPS = 10000
+
+class SQLBackend(QueryBackend):
+    """
+    Runs queries on the SQLAlchemy read-only pool (or this worker's
+    in-memory replica), using rollups when possible.
+    """
+
+    name = "sql"
+
+    def execute(self, sql: str, timeout: Optional[float] = None) -> Tuple[List[str], List[list], str, Optional[str]]:
+        session = get_replica_session() or get_read_session()
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            rewritten_sql, rollup = rewrite_query(sql)
+            if rollup:
+                try:
+                    columns, rows, truncated_by = _execute_limited(session, rewritten_sql, deadline, timeout)
+                    return columns, rows, rollup, truncated_by
+                except QueryTimeout:
+                    raise
+                except Exception as e:
+                    # The rewrite is an optimization: never fail a valid query on it
+                    logger.warning(f"Rollup {rollup} could not answer query, using sales: {e}")
+                    session.rollback()
+            columns, rows, truncated_by = _execute_limited(session, sql, deadline, timeout)
+            return columns, rows, "database", truncated_by
+        finally:
+            session.close()
+
+def _execute_limited(session, sql: str, deadline: Optional[float], timeout: Optional[float]):
+    """
+    Executes and fetches `sql` (translated to the database's dialect) up
+    to the result caps, interrupting it at `deadline`: through a progress
+    handler on SQLite, and statement_timeout on PostgreSQL.
+    """
+    connection = session.connection()
+    sql = translate_sql(sql, connection.dialect.name)
+    if deadline is None:
+        result = connection.execute(text(sql))
+        return (list(result.keys()), *limit_rows(iter_fetchmany(result.fetchmany)))
+
+    dialect = connection.dialect.name
+    dbapi_connection = connection.connection.dbapi_connection
+    if dialect == "sqlite":
+        # A non-zero return value makes SQLite abort the running statement
+        dbapi_connection.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+    elif dialect == "postgresql":
+        remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+        connection.execute(text(f"SET LOCAL statement_timeout = {remaining_ms}"))
+    try:
+        result = connection.execute(text(sql))
+        return (list(result.keys()), *limit_rows(iter_fetchmany(result.fetchmany)))
+    except DBAPIError as e:
+        if time.monotonic() >= deadline:
+            raise QueryTimeout(timeout) from e
+        raise
+    finally:
+        if dialect == "sqlite":
+            dbapi_connection.set_progress_handler(None, 0)
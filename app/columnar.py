@@ -0,0 +1,265 @@
+"""
+In-process columnar engine for the sales dataset.
+Loads `sales` into NumPy arrays (dictionary-encoded dimensions, numeric
+measures) and answers single-table group-by/sum/count/top-k queries with
+vectorized operations. Anything it does not recognize returns None and
+runs on the database instead.
+"""
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from app.services.sql_shape import parse_aggregate_query, AggregateQuery
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_ENGINE = os.getenv("COLUMNAR_ENGINE", "true").lower() == "true"
+
+# Columns stored as (sorted dictionary, int codes); the rest as raw floats
+ENCODED_COLUMNS = [
+    "date", "iso_date", "epoch_day", "year", "month", "week_of_year", "week_day",
+    "hour", "minute_of_day", "ticket_number", "waiter", "product_name",
+]
+MEASURE_COLUMNS = ["quantity", "unitary_price", "total"]
+
+_COMPARISON = re.compile(
+    r"^\s*(?P<column>\w+)\s*(?P<op>=|==|!=|<>|<=|>=|<|>)\s*(?P<value>__lit\d+__|-?\d+(?:\.\d+)?)\s*$"
+)
+_BETWEEN = re.compile(
+    r"^\s*(?P<column>\w+)\s+BETWEEN\s+(?P<low>__lit\d+__|-?\d+(?:\.\d+)?)\s+AND\s+(?P<high>__lit\d+__|-?\d+(?:\.\d+)?)\s*$",
+    re.I
+)
+_OPERATORS = {
+    "=": np.equal, "==": np.equal, "!=": np.not_equal, "<>": np.not_equal,
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+}
+
+class ColumnarStore:
+    """Immutable column arrays for one snapshot of the sales data."""
+
+    def __init__(self, dictionaries: Dict[str, np.ndarray], codes: Dict[str, np.ndarray],
+                 measures: Dict[str, np.ndarray]):
+        self.dictionaries = dictionaries
+        self.codes = codes
+        self.measures = measures
+        self.row_count = len(next(iter(measures.values())))
+
+    @classmethod
+    def load(cls, engine) -> "ColumnarStore":
+        """Reads the sales view once and encodes every column."""
+        columns = ENCODED_COLUMNS + MEASURE_COLUMNS
+        with engine.connect() as conn:
+            rows = conn.execute(text(f"SELECT {', '.join(columns)} FROM sales")).fetchall()
+        raw = list(zip(*rows)) if rows else [()] * len(columns)
+
+        dictionaries, codes, measures = {}, {}, {}
+        for name, values in zip(columns, raw):
+            if name in MEASURE_COLUMNS:
+                measures[name] = np.asarray(values, dtype=np.float64)
+            else:
+                dictionaries[name], inverse = np.unique(np.asarray(values), return_inverse=True)
+                codes[name] = inverse.astype(np.int32)
+        return cls(dictionaries, codes, measures)
+
+    def execute(self, sql: str) -> Optional[Tuple[List[str], List[List[Any]]]]:
+        """Answers a recognized aggregate query, or returns None."""
+        query = parse_aggregate_query(sql)
+        if query is None or query.table != "sales" or not query.is_aggregate:
+            return None
+        if query.having or query.offset is not None:
+            return None
+
+        group_columns = query.group_columns()
+        if group_columns is None or len(group_columns) > 1:
+            return None
+        group = group_columns[0] if group_columns else None
+        if group is not None and group not in self.codes:
+            return None
+
+        mask = self._where_mask(query)
+        if mask is False:
+            return None
+
+        outputs = []  # (name, aggregate or "group", expr) per select item
+        for expr, alias in query.select_items:
+            aggregate = query.aggregate_of(expr)
+            if aggregate is None and (group is None or expr.strip().lower() != group):
+                return None
+            outputs.append((query.output_name(expr, alias), aggregate or "group", expr.strip()))
+
+        group_codes, group_count = self._groups(group, mask)
+        counts = np.bincount(group_codes, minlength=group_count)
+        present = np.flatnonzero(counts) if group else np.arange(group_count)
+
+        result_columns = []
+        for _, kind, _ in outputs:
+            if kind == "group":
+                result_columns.append(self.dictionaries[group][present])
+            else:
+                result_columns.append(self._aggregate(kind, group_codes, group_count, counts, mask)[present])
+
+        order = self._order(query, outputs, result_columns, len(present))
+        if order is False:
+            return None
+
+        columns = [name for name, _, _ in outputs]
+        rows = [list(row) for row in zip(*(_to_python(column[order]) for column in result_columns))]
+        return columns, rows
+
+    def _where_mask(self, query: AggregateQuery):
+        """Row mask for a conjunction of simple comparisons (None = all rows)."""
+        if not query.where:
+            return None
+        mask = np.ones(self.row_count, dtype=bool)
+        # BETWEEN contains its own AND, so protect it before splitting
+        where = re.sub(r"\bBETWEEN\s+(\S+)\s+AND\s+", r"BETWEEN \1 __and__ ", query.where, flags=re.I)
+        for condition in re.split(r"\bAND\b", where, flags=re.I):
+            condition = condition.replace("__and__", "AND")
+            between = _BETWEEN.match(condition)
+            comparison = _COMPARISON.match(condition)
+            if between:
+                column = between.group("column").lower()
+                terms = [
+                    (np.greater_equal, self._value(query, between.group("low"))),
+                    (np.less_equal, self._value(query, between.group("high"))),
+                ]
+            elif comparison:
+                column = comparison.group("column").lower()
+                terms = [(_OPERATORS[comparison.group("op")], self._value(query, comparison.group("value")))]
+            else:
+                return False
+            if column not in self.codes and column not in self.measures:
+                return False
+            for operator, value in terms:
+                condition_mask = self._compare(column, operator, value)
+                if condition_mask is None:
+                    return False
+                mask &= condition_mask
+        return mask
+
+    def _value(self, query: AggregateQuery, token: str):
+        literal = query.literal(token)
+        if literal is not None:
+            return literal
+        return float(token) if "." in token else int(token)
+
+    def _compare(self, column: str, operator, value):
+        """Row mask for `column <op> value`, or None for mixed-type comparisons."""
+        if column in self.measures:
+            if isinstance(value, str):
+                return None
+            return operator(self.measures[column], value)
+        dictionary = self.dictionaries[column]
+        # Text vs number comparisons depend on SQLite affinity rules: skip them
+        if isinstance(value, str) != (dictionary.dtype.kind in "US"):
+            return None
+        # Evaluate on the dictionary once, then map through the codes
+        return operator(dictionary, value)[self.codes[column]]
+
+    def _groups(self, group: Optional[str], mask) -> Tuple[np.ndarray, int]:
+        if group is None:
+            codes = np.zeros(self.row_count, dtype=np.int32)
+            count = 1
+        else:
+            codes = self.codes[group]
+            count = len(self.dictionaries[group])
+        if mask is not None:
+            codes = codes[mask]
+        return codes, count
+
+    def _aggregate(self, kind: str, group_codes: np.ndarray, group_count: int,
+                   counts: np.ndarray, mask) -> np.ndarray:
+        def measure(name):
+            values = self.measures[name]
+            return values[mask] if mask is not None else values
+
+        if kind == "count_rows":
+            return counts
+        if kind == "count_tickets":
+            tickets = self.codes["ticket_number"]
+            if mask is not None:
+                tickets = tickets[mask]
+            pairs = np.unique(group_codes.astype(np.int64) * len(self.dictionaries["ticket_number"]) + tickets)
+            return np.bincount(pairs // len(self.dictionaries["ticket_number"]), minlength=group_count)
+
+        column = "quantity" if kind.endswith("quantity") else "total"
+        sums = np.bincount(group_codes, weights=measure(column), minlength=group_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = sums / counts if kind.startswith("avg") else sums
+        # SUM/AVG over no rows are NULL
+        return np.where(counts > 0, values, np.nan).astype(object)
+
+    def _order(self, query: AggregateQuery, outputs, result_columns, size: int):
+        """Row order for ORDER BY/LIMIT (top-k via argpartition)."""
+        order = np.arange(size)
+        if query.order_by:
+            if len(query.order_by) > 1:
+                return False
+            item = query.order_by[0].strip()
+            descending = bool(re.search(r"\s+DESC$", item, re.I))
+            item = re.sub(r"\s+(ASC|DESC)$", "", item, flags=re.I).strip()
+
+            index = None
+            if item.isdigit() and 0 < int(item) <= len(outputs):
+                index = int(item) - 1
+            for position, (name, kind, expr) in enumerate(outputs):
+                if (item.lower() in (expr.lower(), name.lower())
+                        or (kind != "group" and query.aggregate_of(item) == kind)):
+                    index = position
+            if index is None:
+                return False
+
+            keys = result_columns[index]
+            if keys.dtype.kind in "US":
+                order = np.argsort(keys, kind="stable")
+                if descending:
+                    order = order[::-1]
+            else:
+                keys = keys.astype(float)
+                if descending:
+                    keys = -keys
+                if query.limit is not None and query.limit < size:
+                    # Top-k without sorting every group
+                    top = np.argpartition(keys, query.limit - 1)[:query.limit]
+                    return top[np.argsort(keys[top], kind="stable")]
+                order = np.argsort(keys, kind="stable")
+        if query.limit is not None:
+            order = order[:query.limit]
+        return order
+
+def _to_python(values: np.ndarray) -> List[Any]:
+    """Native Python values (NaN aggregates become None)."""
+    return [
+        None if isinstance(value, float) and value != value else value
+        for value in values.tolist()
+    ]
+
+# Current snapshot; replaced atomically on refresh
+_store: Optional[ColumnarStore] = None
+_lock = threading.Lock()
+
+def refresh_columnar_store(engine) -> None:
+    """Loads a fresh snapshot of the sales data into memory."""
+    global _store
+    if not COLUMNAR_ENGINE:
+        return
+    store = ColumnarStore.load(engine)
+    with _lock:
+        _store = store
+    logger.info(f"Columnar store loaded: {store.row_count} rows")
+
+def execute_columnar(sql: str) -> Optional[Tuple[List[str], List[List[Any]]]]:
+    """Runs `sql` on the columnar store when it can answer it."""
+    store = _store
+    if store is None:
+        return None
+    try:
+        return store.execute(sql)
+    except Exception as e:
+        logger.warning(f"Columnar engine could not answer query: {e}")
+        return None
@@ -1,40 +1,239 @@
+import os
+import hashlib
+import sqlite3
 import logging
-from sqlalchemy import create_engine, text
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 logger = logging.getLogger(__name__)
 
-DATABASE_URL = "sqlite:///./data.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data.db")
 
-# Scalable engine configuration with optimized SQLite
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={
-        "check_same_thread": False,
-        "timeout": 30  # Timeout to avoid long locks
+# Pool configuration (see .env.example)
+POOL_SIZE = int(os.getenv("POOL_SIZE", "20"))
+MAX_OVERFLOW = int(os.getenv("MAX_OVERFLOW", "30"))
+POOL_TIMEOUT = int(os.getenv("POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("POOL_RECYCLE", "3600"))
+
+# SQLite storage profiles, applied with PRAGMAs on every new connection.
+# "default" keeps SQLite's own settings (rollback journal, FULL sync);
+# "read_heavy" lets readers run alongside the loader's writes (WAL) and
+# keeps hot pages in memory. temp_store is left alone: MEMORY halved
+# concurrent GROUP BY throughput on the read pool (benchmarks/bench_pool.py).
+SQLITE_PROFILES = {
+    "default": {},
+    "read_heavy": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),  # negative = KiB
     },
-    # For SQLite: StaticPool is the correct option for concurrency
-    poolclass=StaticPool,
-    echo=False  # True for SQL debug
-)
+}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "read_heavy")
+
+# PRAGMAs that change the database file and need a writable connection
+_WRITE_PRAGMAS = {"journal_mode"}
+
+# Applied while a SQLite database is built from the CSV: no rollback
+# journal and no fsync. A crash mid-build can leave the file unusable;
+# delete it and the next start rebuilds it from the CSV.
+BULK_LOAD_PRAGMAS = {"journal_mode": "OFF", "synchronous": "OFF"}
+
+def _pool_kwargs() -> dict:
+    """Pool sizing shared by every pooled engine."""
+    return {
+        "poolclass": QueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+    }
+
+def _sqlite_path(url) -> str:
+    """Returns the file path of a SQLite URL (None for in-memory databases)."""
+    database = url.database
+    if not database or database == ":memory:":
+        return None
+    return database
+
+def database_file(database_url: str = DATABASE_URL) -> str:
+    """Path of the SQLite database file, or None for other backends."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return None
+    return _sqlite_path(url)
+
+def apply_sqlite_profile(engine, profile: str = SQLITE_PROFILE, read_only: bool = False):
+    """Registers a connect hook that applies the storage profile PRAGMAs."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE '{profile}', expected one of {list(SQLITE_PROFILES)}")
+    pragmas = {
+        name: value for name, value in SQLITE_PROFILES[profile].items()
+        if not (read_only and name in _WRITE_PRAGMAS)
+    }
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_db_engine(database_url: str = DATABASE_URL, read_only: bool = False,
+                     profile: str = SQLITE_PROFILE):
+    """
+    Builds an engine with a connection pool suited to the backend.
+    PostgreSQL gets a QueuePool; SQLite files get a pool of independent
+    connections (opened read-only when requested) so concurrent queries
+    no longer share a single connection, configured with `profile`.
+    """
+    url = make_url(database_url)
+
+    if url.get_backend_name() != "sqlite":
+        connect_args = {}
+        if read_only and url.get_backend_name() == "postgresql":
+            # Server-side guard on top of validate_sql_safety
+            connect_args["options"] = "-c default_transaction_read_only=on"
+        return create_engine(url, pool_pre_ping=True, echo=False, connect_args=connect_args,
+                             **_pool_kwargs())
+
+    path = _sqlite_path(url)
+    if path is None:
+        # In-memory databases only exist inside one connection
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=False
+        )
+
+    if read_only:
+        def connect():
+            return sqlite3.connect(
+                f"file:{os.path.abspath(path)}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                timeout=30
+            )
+        read_engine = create_engine("sqlite://", creator=connect, echo=False, **_pool_kwargs())
+        apply_sqlite_profile(read_engine, profile, read_only=True)
+        return read_engine
+
+    write_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": 30  # Timeout to avoid long locks
+        },
+        echo=False,  # True for SQL debug
+        **_pool_kwargs()
+    )
+    apply_sqlite_profile(write_engine, profile)
+    return write_engine
+
+# Single writer (schema + loading) and read-only pool (queries): with WAL,
+# readers in run_query never wait on the writer in csv_loader
+engine = create_db_engine(DATABASE_URL)
+read_engine = create_db_engine(DATABASE_URL, read_only=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
-def init_db():
+def _drop_outdated_tables(engine):
+    """
+    Drops the model tables when their columns no longer match the models
+    (missing, or left over from an older layout).
+    The tables reference each other by surrogate keys and are rebuilt
+    from the CSV, so they are dropped together and reloaded.
+    """
+    inspector = inspect(engine)
+    if "sales" in inspector.get_table_names():
+        # Flat table from before the star schema; `sales` is now a view
+        logger.warning("Dropping legacy flat sales table, data will be reloaded")
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE sales"))
+
+    outdated = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = set(table.columns.keys()) - existing
+        extra = existing - set(table.columns.keys())
+        if missing or extra:
+            outdated.append(f"{table.name} missing {sorted(missing)}, extra {sorted(extra)}")
+    if outdated:
+        logger.warning(f"Tables with changed columns: {'; '.join(outdated)}, rebuilding all data tables")
+        with engine.begin() as conn:
+            # PostgreSQL refuses to drop tables a view depends on
+            conn.execute(text("DROP VIEW IF EXISTS sales"))
+        Base.metadata.drop_all(bind=engine)
+
+def init_db(engine=engine):
     """Initializes the database with logging."""
     try:
-        from app.models import Sale
+        from app.models import SALES_VIEW_SQL
+        _drop_outdated_tables(engine)
         Base.metadata.create_all(bind=engine)
+        # Recreated only when the models changed it, so a start on an
+        # up-to-date database does not write
+        view_hash = hashlib.sha256(SALES_VIEW_SQL.encode()).hexdigest()
+        with engine.connect() as conn:
+            view_current = ("sales" in inspect(conn).get_view_names()
+                            and get_meta(conn, "sales_view_sha256") == view_hash)
+        if not view_current:
+            with engine.begin() as conn:
+                conn.execute(text("DROP VIEW IF EXISTS sales"))
+                conn.execute(text(SALES_VIEW_SQL))
+                set_meta(conn, "sales_view_sha256", view_hash)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
 
-def get_session():
-    """Gets database session from connection pool."""
-    return SessionLocal()
+@contextmanager
+def bulk_load_connection(bind=None):
+    """
+    Yields one connection of `bind` (default: the writer engine) for a
+    bulk build. On SQLite it runs with BULK_LOAD_PRAGMAS, and the
+    previous settings (e.g. the profile's WAL/NORMAL) are restored
+    before it goes back to the pool.
+    """
+    with (bind if bind is not None else engine).connect() as connection:
+        if connection.dialect.name != "sqlite":
+            yield connection
+            return
+        dbapi_connection = connection.connection.dbapi_connection
+        previous = {
+            name: dbapi_connection.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in BULK_LOAD_PRAGMAS
+        }
+        for name, value in BULK_LOAD_PRAGMAS.items():
+            try:
+                dbapi_connection.execute(f"PRAGMA {name}={value}")
+            except sqlite3.OperationalError as e:
+                # e.g. another open connection keeps the database in WAL
+                logger.warning(f"Loading without PRAGMA {name}={value}: {e}")
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            for name, value in previous.items():
+                dbapi_connection.execute(f"PRAGMA {name}={value}")
+
+def get_session(bind=None):
+    """Gets database session from connection pool (or on another engine)."""
+    return SessionLocal(bind=bind) if bind is not None else SessionLocal()
+
+def get_read_session():
+    """Gets a session from the read-only connection pool."""
+    return ReadSessionLocal()
 
 def get_db():
     """Generator for dependency injection in FastAPI."""
@@ -44,10 +243,34 @@ def get_db():
     finally:
         db.close()
 
+def get_meta(session, key: str):
+    """Reads a value from the ingest_meta table (None when unset)."""
+    return session.execute(
+        text("SELECT value FROM ingest_meta WHERE key = :key"), {"key": key}
+    ).scalar()
+
+def set_meta(session, key: str, value):
+    """Writes a value to the ingest_meta table (committed by the caller)."""
+    session.execute(text("DELETE FROM ingest_meta WHERE key = :key"), {"key": key})
+    session.execute(
+        text("INSERT INTO ingest_meta (key, value) VALUES (:key, :value)"),
+        {"key": key, "value": str(value)}
+    )
+
+def get_data_version(session) -> int:
+    """Version of the loaded data, bumped by every load (0 when never loaded)."""
+    return int(get_meta(session, "data_version") or 0)
+
+def bump_data_version(session) -> int:
+    """Marks the data as changed (committed by the caller)."""
+    version = get_data_version(session) + 1
+    set_meta(session, "data_version", version)
+    return version
+
 def check_db_health() -> bool:
     """Verifica la salud de la base de datos."""
     try:
-        session = get_session()
+        session = get_read_session()
         session.execute(text("SELECT 1"))
         session.close()
         return True
@@ -0,0 +1,183 @@
+"""
+Optional hot reload of the source CSV (CSV_WATCH). Every worker checks
+the file's mtime and size each CSV_WATCH_INTERVAL seconds; once a change
+has settled (unchanged for one interval) the file is hashed and, when
+its content differs from the loaded one, a single worker (holding the
+load lock) loads it into a new database file next to the live one.
+That file is then copied over the live database with the SQLite backup
+API in one transaction: readers keep their WAL snapshot of the previous
+data until the commit, so nothing blocks and every worker's engines
+stay valid. The copy carries a bumped data version, which each worker's
+watcher picks up to refresh its in-memory copies and to stop serving
+results cached for the old data.
+
+The data version check runs in every worker even without CSV_WATCH, so
+rows added by another worker (POST /ingest) reach all of them.
+"""
+import os
+import asyncio
+import logging
+import sqlite3
+import threading
+import contextlib
+from typing import Optional, Tuple
+
+from app.backends import get_backend
+from app.columnar import refresh_columnar_store
+from app.database import create_db_engine, database_file, get_data_version, get_meta, init_db, read_engine, set_meta
+from app.replica import refresh_replica
+from app.services.cache import cache_service
+from app.utils.csv_loader import load_csv_streaming
+from app.utils.load_coordinator import try_load_lock
+from app.utils.snapshot import csv_content_hash
+from app.utils.sources import is_multi_source
+
+logger = logging.getLogger(__name__)
+
+CSV_WATCH = os.getenv("CSV_WATCH", "false").lower() == "true"
+# Seconds between checks of the file and of the data version
+CSV_WATCH_INTERVAL = float(os.getenv("CSV_WATCH_INTERVAL", "5"))
+
+def _signature(csv_path: str) -> Optional[Tuple[int, int]]:
+    """(mtime, size) of the file, or None while it is missing (being replaced)."""
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def rebuild_database(csv_path: str, content_hash: str) -> int:
+    """
+    Loads `csv_path` into a new database file and copies it over the
+    live one in a single transaction. Returns the new data version.
+    """
+    live_path = database_file()
+    build_path = f"{live_path}.build"
+    _remove_database(build_path)
+    build_engine = create_db_engine(f"sqlite:///{build_path}")
+    try:
+        init_db(build_engine)
+        load_csv_streaming(csv_path, content_hash=content_hash, engine=build_engine)
+        with read_engine.connect() as conn:
+            version = get_data_version(conn) + 1
+        with build_engine.begin() as conn:
+            set_meta(conn, "data_version", version)
+        build_engine.dispose()
+
+        source = sqlite3.connect(build_path)
+        target = sqlite3.connect(live_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        logger.info(f"Swapped in database rebuilt from {csv_path} (data version {version})")
+        return version
+    finally:
+        build_engine.dispose()
+        _remove_database(build_path)
+
+def _remove_database(path: str):
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+
+class CsvWatcher:
+    """
+    Per-worker watcher state; check() runs once per interval. Without a
+    `csv_path` only the data version is followed.
+    """
+
+    def __init__(self, csv_path: Optional[str], data_version: int):
+        self.csv_path = csv_path
+        self.data_version = data_version
+        self._sync_lock = threading.Lock()
+        # The file was loaded (or verified) during startup
+        self._loaded = _signature(csv_path) if csv_path else None
+        self._last_seen = self._loaded
+
+    def check(self):
+        if self.csv_path:
+            signature = _signature(self.csv_path)
+            settled = signature == self._last_seen
+            self._last_seen = signature
+            if signature is not None and settled and signature != self._loaded:
+                if self._reload():
+                    self._loaded = signature
+        self.sync_data_version()
+
+    def _reload(self) -> bool:
+        """
+        Rebuilds the database when the file's content changed. Returns
+        False when another worker holds the load lock (retried next tick).
+        """
+        content_hash = csv_content_hash(self.csv_path)
+        with read_engine.connect() as conn:
+            if get_meta(conn, "csv_sha256") == content_hash:
+                return True
+        with try_load_lock() as locked:
+            if not locked:
+                return False
+            # Another worker may have finished the rebuild meanwhile
+            with read_engine.connect() as conn:
+                if get_meta(conn, "csv_sha256") != content_hash:
+                    logger.info(f"{self.csv_path} changed, rebuilding the database")
+                    rebuild_database(self.csv_path, content_hash)
+        return True
+
+    def sync_data_version(self):
+        """Refreshes this worker's in-memory state after the data changed."""
+        with self._sync_lock:
+            with read_engine.connect() as conn:
+                version = get_data_version(conn)
+            if version == self.data_version:
+                return
+            refresh_columnar_store(read_engine)
+            refresh_replica(force=True)
+            get_backend().refresh()
+            # Last, so results computed from the old copies are never
+            # cached under the new version
+            cache_service.set_data_version(version)
+            self.data_version = version
+            logger.info(f"Serving data version {version}")
+
+_task: Optional[asyncio.Task] = None
+_watcher: Optional[CsvWatcher] = None
+
+def start_csv_watcher(csv_path: str, data_version: int):
+    """Starts this worker's watcher; the file is only watched with CSV_WATCH."""
+    global _task, _watcher
+    watch_file = CSV_WATCH
+    if watch_file and database_file() is None:
+        logger.warning("CSV_WATCH only applies to SQLite database files, ignoring")
+        watch_file = False
+    if watch_file and is_multi_source(csv_path):
+        logger.warning("CSV_WATCH only applies to a single CSV file, ignoring")
+        watch_file = False
+    _watcher = CsvWatcher(csv_path if watch_file else None, data_version)
+    _task = asyncio.create_task(_watch(_watcher))
+    if watch_file:
+        logger.info(f"Watching {csv_path} for changes every {CSV_WATCH_INTERVAL:g}s")
+
+def sync_data_version():
+    """Picks up a data change right away (e.g. after this worker ingested rows)."""
+    if _watcher is not None:
+        _watcher.sync_data_version()
+
+async def _watch(watcher: CsvWatcher):
+    while True:
+        await asyncio.sleep(CSV_WATCH_INTERVAL)
+        try:
+            # Hashing and rebuilding run off the event loop
+            await asyncio.to_thread(watcher.check)
+        except Exception as e:
+            logger.error(f"CSV watcher check failed: {e}")
+
+async def stop_csv_watcher():
+    global _task, _watcher
+    if _task is not None:
+        _task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _task
+        _task = None
+    _watcher = None
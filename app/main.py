@@ -1,17 +1,30 @@
 import logging
 import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.database import init_db, get_db, check_db_health
-from app.utils.csv_loader import load_csv_to_db
+from app.backends import get_backend
+from app.columnar import refresh_columnar_store
+from app.database import get_db, check_db_health, get_data_version, read_engine
+from app.replica import init_replica, close_replica
+from app.hot_reload import start_csv_watcher, stop_csv_watcher, sync_data_version
+from app.utils.load_coordinator import coordinated_load
+from app.utils.sources import CSV_SOURCE
 from app.services.llm import generate_sql, suggest_chart_simple
-from app.services.query_runner import run_query, validate_sql_safety, get_query_stats
+from app.backends.base import QueryTimeout
+from app.services.query_runner import (
+    run_query, validate_sql_safety, get_query_stats, start_query_executor, shutdown_query_executor,
+    QUERY_TIMEOUTS, query_metrics
+)
 from app.services.cache import cache_service, init_cache, cleanup_cache
+from app.services.ingest import IngestError, ingest_stream
+from app.services.rollups import rollup_hits
 
 # Configure logging
 logging.basicConfig(
@@ -37,15 +50,34 @@ async def lifespan(app: FastAPI):
     """Application lifecycle management."""
     # Startup
     logger.info("Starting application...")
+    started = time.perf_counter()
     try:
         # Initialize scalable cache (Redis + memory)
         await init_cache()
         logger.info("Cache initialized successfully")
         
-        # Initialize database
-        init_db()
-        load_csv_to_db("data.csv")
+        # Initialize database (one worker loads, the others wait for it)
+        load_started = time.perf_counter()
+        data_source = coordinated_load(CSV_SOURCE)
+        load_seconds = time.perf_counter() - load_started
         logger.info("Database initialized successfully")
+
+        # In-memory columnar copy for vectorized aggregates
+        refresh_columnar_store(read_engine)
+        # Optional private in-memory copy of the database for this worker
+        init_replica()
+        get_backend().prepare()
+        start_query_executor()
+
+        # Cached results are scoped to the data version they were computed on
+        with read_engine.connect() as conn:
+            data_version = get_data_version(conn)
+        cache_service.set_data_version(data_version)
+        start_csv_watcher(CSV_SOURCE, data_version)
+        logger.info(
+            f"Cold start completed in {time.perf_counter() - started:.2f}s "
+            f"(data load {load_seconds:.2f}s from {data_source})"
+        )
     except Exception as e:
         logger.error(f"Startup error: {e}")
         raise
@@ -54,6 +86,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application...")
+    await stop_csv_watcher()
+    shutdown_query_executor()
+    get_backend().close()
+    close_replica()
     try:
         await cleanup_cache()
         logger.info("Cache closed successfully")
@@ -140,7 +176,7 @@ async def ask_question(request: QuestionRequest):
             )
         
         # Execute query with cache
-        data = await run_query(sql)
+        data = await run_query(sql, timeout=QUERY_TIMEOUTS["ask"])
         
         # Generate chart suggestion based on question and SQL
         chart_suggestion = suggest_chart_simple(request.question, sql)
@@ -150,11 +186,14 @@ async def ask_question(request: QuestionRequest):
             "data": data,
             "chart_suggestion": chart_suggestion,
             "cached": True,  # Can always come from cache
-            "row_count": len(data["rows"])
+            "row_count": len(data["rows"]),
+            "served_by": data.get("served_by", "database")
         }
         
     except HTTPException:
         raise
+    except QueryTimeout as e:
+        raise HTTPException(status_code=408, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing question: {e}")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
@@ -175,9 +214,10 @@ async def execute_query(request: QueryRequest):
         # Execute with pagination if specified
         if request.page > 1 or request.page_size != 100:
             from app.services.query_runner import run_query_paginated
-            data = run_query_paginated(request.sql, request.page, request.page_size)
+            data = await run_query_paginated(request.sql, request.page, request.page_size,
+                                             timeout=QUERY_TIMEOUTS["query"])
         else:
-            data = await run_query(request.sql)
+            data = await run_query(request.sql, timeout=QUERY_TIMEOUTS["query"])
         
         return {
             "sql": request.sql,
@@ -186,10 +226,40 @@ async def execute_query(request: QueryRequest):
         
     except HTTPException:
         raise
+    except QueryTimeout as e:
+        raise HTTPException(status_code=408, detail=str(e))
     except Exception as e:
         logger.error(f"Error executing query: {e}")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
+@app.post("/ingest")
+async def ingest(request: Request, format: Optional[str] = None):
+    """
+    Endpoint for appending sales rows from a (chunked) CSV or NDJSON
+    body, with the same columns as data.csv (rows already loaded are
+    skipped and counted). The format comes from the
+    `format` parameter or the Content-Type (NDJSON for
+    application/x-ndjson, CSV otherwise).
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    try:
+        result = await ingest_stream(request.stream(), format.lower())
+        if result["rows"] > result["skipped"]:
+            # This worker serves the new rows right away; the others
+            # pick up the data version on their next check
+            await asyncio.to_thread(sync_data_version)
+        return result
+
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error ingesting rows: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
 @app.get("/stats")
 async def get_stats():
     """Endpoint to get database statistics."""
@@ -203,7 +273,9 @@ async def get_stats():
         
         return {
             "stats": stats,
-            "cache_info": cache_info
+            "cache_info": cache_info,
+            "served_by": dict(rollup_hits),
+            "query_metrics": dict(query_metrics)
         }
         
     except Exception as e:
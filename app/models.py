@@ -1,10 +1,123 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey
+from sqlalchemy.orm import declarative_base
 from app.database import Base
 
-class Sale(Base):
+# Views are created with raw DDL in init_db, so they live outside Base.metadata
+ViewBase = declarative_base()
+
+# Dimension tables: each distinct value is stored once and referenced
+# from the fact table through an integer surrogate key.
+class Product(Base):
+    __tablename__ = "products"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+class Ticket(Base):
+    """
+    Ticket dimension, one row per customer basket. A ticket is issued at a
+    single date/time by one waiter, so those attributes are per ticket:
+    date, week_day and hour are stored when the ticket is first inserted
+    (a row that contradicts them fails the load), the other columns are
+    materialized after each load (see csv_loader.materialize_tickets).
+    """
+    __tablename__ = "tickets"
+
+    id = Column(Integer, primary_key=True)
+    ticket_number = Column(String, unique=True, nullable=False)
+    date = Column(String)
+    iso_date = Column(String)
+    epoch_day = Column(Integer)
+    year = Column(Integer)
+    month = Column(Integer)
+    week_of_year = Column(Integer)
+    week_day = Column(String)
+    hour = Column(String)
+    minute_of_day = Column(Integer)
+    waiter = Column(Integer)
+    line_count = Column(Integer)    # sales rows on the ticket
+    item_count = Column(Float)      # SUM(quantity)
+    basket_total = Column(Float)    # SUM(total)
+
+class Waiter(Base):
+    __tablename__ = "waiters"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(Integer, unique=True, nullable=False)
+
+class SaleFact(Base):
+    __tablename__ = "sales_fact"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
+    waiter_id = Column(Integer, ForeignKey("waiters.id"), nullable=False)
+    quantity = Column(Float)
+    unitary_price = Column(Float)
+    total = Column(Float)
+
+    # Typed, sargable date/time columns derived from the row's date and
+    # hour at ingest (the text date, week_day and hour live on tickets)
+    iso_date = Column(String)        # YYYY-MM-DD, sorts chronologically
+    epoch_day = Column(Integer)      # days since 1970-01-01
+    year = Column(Integer)
+    month = Column(Integer)
+    week_of_year = Column(Integer)   # ISO week number
+    minute_of_day = Column(Integer)  # hour * 60 + minute
+
+    # Row identity for idempotent loads (csv_loader._RowFingerprints):
+    # rows whose fingerprint is already stored are skipped on insert.
+    # NULL for rows written outside the loader, which never conflict
+    fingerprint = Column(BigInteger, unique=True, index=True)
+
+class IngestMeta(Base):
+    """Key/value state of the data load (e.g. the loaded CSV's content hash)."""
+    __tablename__ = "ingest_meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+class IngestedFile(Base):
+    """A source file already loaded, identified by the checksum of its bytes."""
+    __tablename__ = "ingested_files"
+
+    sha256 = Column(String, primary_key=True)
+    path = Column(String)
+    row_count = Column(Integer)
+    loaded_at = Column(String)  # ISO timestamp
+
+class IngestProgress(Base):
+    """
+    Last checkpoint of a cold load in progress (csv_loader.load_csv_checkpointed),
+    removed when the load completes.
+    """
+    __tablename__ = "ingest_progress"
+
+    sha256 = Column(String, primary_key=True)  # content hash of the file being loaded
+    path = Column(String)
+    batch_id = Column(Integer)           # batches committed so far
+    byte_offset = Column(BigInteger)     # where the next batch starts
+    row_count = Column(Integer)          # rows inserted so far
+    quarantined = Column(Integer)        # rows quarantined so far
+    updated_at = Column(String)          # ISO timestamp
+
+class QuarantinedRow(Base):
+    """A CSV line that failed validation during a checkpointed load."""
+    __tablename__ = "quarantined_rows"
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String, index=True)  # content hash of the source file
+    path = Column(String)
+    byte_offset = Column(BigInteger)     # start of the line in the file
+    line = Column(String)
+    error = Column(String)
+    quarantined_at = Column(String)      # ISO timestamp
+
+class Sale(ViewBase):
+    """Read-only compatibility view with the original flat sales layout."""
     __tablename__ = "sales"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     date = Column(String)
     week_day = Column(String)
     hour = Column(String)
@@ -14,3 +127,51 @@ class Sale(Base):
     quantity = Column(Float)
     unitary_price = Column(Float)
     total = Column(Float)
+    iso_date = Column(String)
+    epoch_day = Column(Integer)
+    year = Column(Integer)
+    month = Column(Integer)
+    week_of_year = Column(Integer)
+    minute_of_day = Column(Integer)
+
+# Existing LLM SQL and /query users keep querying `sales`.
+# LEFT JOINs on the surrogate keys keep the fact table as the driving
+# table; SQLite turns them into inner joins (and uses the dimension's
+# unique index) when a query filters on a dimension value.
+SALES_VIEW_SQL = """
+    CREATE VIEW sales AS
+    SELECT f.id, t.date, t.week_day, t.hour, t.ticket_number, w.code AS waiter,
+           p.name AS product_name, f.quantity, f.unitary_price, f.total,
+           f.iso_date, f.epoch_day, f.year, f.month, f.week_of_year, f.minute_of_day
+    FROM sales_fact f
+    LEFT JOIN products p ON p.id = f.product_id
+    LEFT JOIN tickets t ON t.id = f.ticket_id
+    LEFT JOIN waiters w ON w.id = f.waiter_id
+"""
+
+# Secondary indexes on sales_fact, built after bulk loads instead of being
+# maintained row by row during inserts (see csv_loader.build_indexes).
+# The (product_id, quantity, total) composite also serves plain
+# product lookups and covers SUM(quantity)/SUM(total) per product.
+SALES_INDEXES = {
+    "ix_sales_fact_product_quantity_total": ["product_id", "quantity", "total"],
+    "ix_sales_fact_ticket_id": ["ticket_id"],
+    "ix_sales_fact_waiter_id": ["waiter_id"],
+    "ix_sales_fact_iso_date": ["iso_date"],
+    "ix_sales_fact_epoch_day": ["epoch_day"],
+    "ix_sales_fact_year_month": ["year", "month"],
+    "ix_sales_fact_minute_of_day": ["minute_of_day"],
+}
+
+# The view's date, week_day and hour come from tickets, so their filters
+# start from these indexes and reach the facts through ix_sales_fact_ticket_id
+TICKET_INDEXES = {
+    "ix_tickets_date": ["date"],
+    "ix_tickets_week_day_hour": ["week_day", "hour"],
+}
+
+# Table -> managed indexes, dropped and rebuilt around bulk loads
+MANAGED_INDEXES = {
+    "sales_fact": SALES_INDEXES,
+    "tickets": TICKET_INDEXES,
+}
@@ -0,0 +1,122 @@
+"""
+Optional per-worker in-memory copy of the SQLite database (MEMORY_REPLICA).
+During startup each worker copies data.db into a private in-memory
+database with the SQLite backup API, and the SQL backend reads from that
+copy instead of contending with the other workers for the shared file.
+The copy is rebuilt and swapped in when the data version on disk changes.
+"""
+import os
+import time
+import sqlite3
+import logging
+import itertools
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import _pool_kwargs, database_file, get_data_version, read_engine
+
+logger = logging.getLogger(__name__)
+
+MEMORY_REPLICA = os.getenv("MEMORY_REPLICA", "false").lower() == "true"
+# Seconds between checks of the on-disk data version
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+
+_names = itertools.count()
+
+class MemoryReplica:
+    """One consistent in-memory copy of the database file."""
+
+    def __init__(self, uri: str, anchor: sqlite3.Connection, data_version: int):
+        self.uri = uri
+        self.data_version = data_version
+        # The shared in-memory database lives as long as one connection does
+        self._anchor = anchor
+
+        def connect():
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            connection.execute("PRAGMA query_only = ON")
+            return connection
+
+        self.engine = create_engine("sqlite://", creator=connect, echo=False, **_pool_kwargs())
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    @classmethod
+    def build(cls, path: str) -> "MemoryReplica":
+        """Copies the database file at `path` into a new in-memory database."""
+        started = time.perf_counter()
+        uri = f"file:replica_{os.getpid()}_{next(_names)}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            source.backup(anchor)
+        finally:
+            source.close()
+        # Read from the copy itself so the version matches the copied data
+        row = anchor.execute("SELECT value FROM ingest_meta WHERE key = 'data_version'").fetchone()
+        replica = cls(uri, anchor, int(row[0]) if row else 0)
+        logger.info(
+            f"In-memory replica built in {(time.perf_counter() - started) * 1000:.0f}ms "
+            f"(data version {replica.data_version})"
+        )
+        return replica
+
+    def close(self):
+        """Closes idle connections; checked-out ones close when returned."""
+        self.engine.dispose()
+        self._anchor.close()
+
+# Current replica; replaced atomically on refresh
+_replica: Optional[MemoryReplica] = None
+_refresh_lock = threading.Lock()
+_last_check = 0.0
+
+def init_replica():
+    """Builds this worker's replica when MEMORY_REPLICA is enabled."""
+    global _replica, _last_check
+    path = database_file()
+    if not MEMORY_REPLICA:
+        return
+    if path is None:
+        logger.warning("MEMORY_REPLICA only applies to SQLite database files, ignoring")
+        return
+    _replica = MemoryReplica.build(path)
+    _last_check = time.monotonic()
+
+def refresh_replica(force: bool = False) -> bool:
+    """
+    Rebuilds the replica when the on-disk data version differs from the
+    copied one. Concurrent callers keep reading the current copy instead
+    of waiting. Returns True when a new replica was swapped in.
+    """
+    global _replica, _last_check
+    current = _replica
+    if current is None or not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        _last_check = time.monotonic()
+        with read_engine.connect() as conn:
+            version = get_data_version(conn)
+        if not force and version == current.data_version:
+            return False
+        _replica = MemoryReplica.build(database_file())
+        current.close()
+        return True
+    finally:
+        _refresh_lock.release()
+
+def get_replica_session() -> Optional[Session]:
+    """A session on the in-memory replica, or None when it is disabled."""
+    if _replica is None:
+        return None
+    if time.monotonic() - _last_check >= REPLICA_CHECK_INTERVAL:
+        refresh_replica()
+    return _replica.sessionmaker()
+
+def close_replica():
+    global _replica
+    if _replica is not None:
+        _replica.close()
+        _replica = None
@@ -25,6 +25,9 @@ class CacheService:
         self.redis_client: Optional[redis.Redis] = None
         self.memory_cache: Dict[str, Any] = {}
         self.redis_available = False
+        # Version of the loaded data; part of every key, so results
+        # cached for replaced data are never served again
+        self.data_version = 0
         
     async def initialize(self):
         """Initializes Redis connection if available."""
@@ -63,7 +66,13 @@ class CacheService:
         """Generates a unique key for the cache."""
         data_str = json.dumps(data, sort_keys=True, default=str)
         hash_obj = hashlib.md5(data_str.encode())
-        return f"{prefix}:{hash_obj.hexdigest()}"
+        return f"{prefix}:v{self.data_version}:{hash_obj.hexdigest()}"
+
+    def set_data_version(self, version: int):
+        """Switches keys to a new data version (old entries expire by TTL)."""
+        if version != self.data_version:
+            self.data_version = version
+            self.memory_cache.clear()
     
     async def get(self, key: str) -> Optional[Any]:
         """Gets a value from the cache."""
@@ -0,0 +1,188 @@
+"""
+Streaming ingestion of uploaded sales rows (POST /ingest).
+The request body is read chunk by chunk on the event loop and handed to
+a writer thread through a bounded queue: when the inserts fall behind,
+the loop stops reading the body and TCP flow control slows the client
+down, so an upload is never buffered whole. Rows are parsed as they
+arrive (CSV with data.csv's columns, or NDJSON with one object per
+line) and inserted with the loader's batch path in one transaction;
+rows already stored (same fingerprint) are skipped, so a retried upload
+is harmless.
+
+Uploaded rows live only in the database: a reload from a changed
+data.csv (cold load or hot reload) replaces them.
+"""
+import os
+import csv
+import json
+import time
+import queue
+import codecs
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator
+
+from sqlalchemy import text
+
+from app.database import bump_data_version, get_session
+from app.utils.csv_loader import (
+    CSV_BATCH_SIZE, CSV_LOAD_MODE, AttributeConflictError, _RowFingerprints, _bulk_insert_batch,
+    _load_dimensions, _process_row, _use_dbapi, build_rollups, materialize_tickets
+)
+from app.utils.load_coordinator import load_lock
+
+logger = logging.getLogger(__name__)
+
+# Body chunks buffered between the event loop and the writer thread
+INGEST_QUEUE_CHUNKS = int(os.getenv("INGEST_QUEUE_CHUNKS", "64"))
+# Seconds an upload waits for a running load or upload to finish
+INGEST_LOCK_TIMEOUT = float(os.getenv("INGEST_LOCK_TIMEOUT", "30"))
+
+FORMATS = ("csv", "ndjson")
+
+class IngestError(ValueError):
+    """The upload is malformed; nothing from it was stored."""
+
+_END = object()
+_ABORT = object()
+
+async def ingest_stream(chunks: AsyncIterator[bytes], fmt: str = "csv",
+                        batch_size: int = CSV_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Inserts the rows of a streamed body. Returns the rows received and
+    skipped as duplicates, timing and the new data version.
+    """
+    if fmt not in FORMATS:
+        raise IngestError(f"Unknown format '{fmt}', expected one of {list(FORMATS)}")
+    chunk_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_CHUNKS)
+    loop = asyncio.get_running_loop()
+    writer = loop.run_in_executor(None, _write_rows, _queued(chunk_queue), fmt, batch_size)
+
+    async def feed(item) -> bool:
+        """Queues an item, waiting while the queue is full (backpressure)."""
+        while not writer.done():
+            try:
+                chunk_queue.put_nowait(item)
+                return True
+            except queue.Full:
+                await asyncio.sleep(0.005)
+        return False
+
+    finished = False
+    try:
+        async for chunk in chunks:
+            if chunk and not await feed(chunk):
+                break  # the writer failed; its error is raised below
+        finished = await feed(_END)
+        return await writer
+    finally:
+        if not finished and not writer.done():
+            # Client disconnected or the request failed: roll back
+            await feed(_ABORT)
+            await asyncio.gather(writer, return_exceptions=True)
+
+def _queued(chunk_queue: queue.Queue) -> Iterator[bytes]:
+    while True:
+        item = chunk_queue.get()
+        if item is _END:
+            return
+        if item is _ABORT:
+            raise ConnectionAbortedError("Upload aborted")
+        yield item
+
+def _lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decodes UTF-8 chunks into lines (split multi-byte characters are fine)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def _records(lines: Iterator[str], fmt: str) -> Iterator[Dict[str, str]]:
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            for record in reader:
+                # Short rows come back with None values, long ones with a None key
+                if None in record or None in record.values():
+                    raise IngestError(f"Line {reader.line_num}: expected the fields {', '.join(reader.fieldnames)}")
+                yield record
+        except csv.Error as e:
+            raise IngestError(f"Malformed CSV after line {reader.line_num} ({e})")
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise IngestError(f"Line {number}: invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise IngestError(f"Line {number}: expected a JSON object")
+        # Same text values as a CSV row, so both formats validate alike
+        yield {key: str(value) for key, value in record.items() if value is not None}
+
+def _write_rows(chunks: Iterator[bytes], fmt: str, batch_size: int) -> Dict[str, Any]:
+    """Runs in a worker thread: parses, validates and inserts the rows."""
+    with load_lock(timeout=INGEST_LOCK_TIMEOUT):
+        started = time.perf_counter()
+        session = get_session()
+        try:
+            dimensions = _load_dimensions(session)
+            raw = _use_dbapi(CSV_LOAD_MODE)
+            last_id = session.execute(text("SELECT COALESCE(MAX(id), 0) FROM sales_fact")).scalar()
+
+            fingerprints = _RowFingerprints()
+            total_records = 0
+            inserted = 0
+            batch = []
+            for number, record in enumerate(_records(_lines(chunks), fmt), 1):
+                try:
+                    batch.append(_process_row(record))
+                except (KeyError, ValueError) as e:
+                    raise IngestError(f"Row {number}: invalid or missing value {e}")
+                if len(batch) >= batch_size:
+                    inserted += _bulk_insert_batch(session, fingerprints.add(batch), dimensions, raw)
+                    total_records += len(batch)
+                    batch = []
+            if batch:
+                inserted += _bulk_insert_batch(session, fingerprints.add(batch), dimensions, raw)
+                total_records += len(batch)
+            insert_seconds = time.perf_counter() - started
+
+            data_version = None
+            if inserted:
+                session.commit()
+                materialize_tickets(session, after_id=last_id)
+                build_rollups(session)
+                data_version = bump_data_version(session)
+                session.commit()
+
+            seconds = time.perf_counter() - started
+            logger.info(
+                f"Ingested {total_records} uploaded rows ({fmt}, {total_records - inserted} "
+                f"duplicates skipped) in {seconds:.2f}s"
+            )
+            return {
+                "rows": total_records,
+                "skipped": total_records - inserted,
+                "format": fmt,
+                "seconds": round(seconds, 3),
+                "insert_seconds": round(insert_seconds, 3),
+                "rows_per_s": round(total_records / insert_seconds) if insert_seconds else 0,
+                "data_version": data_version,
+            }
+
+        except AttributeConflictError as e:
+            session.rollback()
+            raise IngestError(str(e))
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -9,23 +9,35 @@ client = OpenAI(
 PROMPT = """
 You are a SQL query generator. Convert natural language questions into valid SQL queries for a SQLite database.
 
-Database: Single table 'sales' with sales data loaded from CSV
-Columns: date, week_day, hour, ticket_number, waiter, product_name, quantity, unitary_price, total
+Database: table 'sales' with sales data loaded from CSV, plus table 'tickets' with one row per ticket
+sales columns: date, week_day, hour, ticket_number, waiter, product_name, quantity, unitary_price, total,
+iso_date, epoch_day, year, month, week_of_year, minute_of_day
+tickets columns: ticket_number, date, week_day, hour, waiter, iso_date, epoch_day, year, month, week_of_year,
+minute_of_day, line_count (products on the ticket), item_count (SUM(quantity)), basket_total (SUM(total))
 
 Data structure:
-- Each row = one product sold in a transaction
+- Each sales row = one product sold in a transaction
 - ticket_number = unique identifier for each customer transaction
-- To count customers, use COUNT(DISTINCT ticket_number)
+- Each tickets row = one customer transaction, so customers = rows of tickets
+- date (MM/DD/YYYY) and hour (HH:MM) are display strings: never filter, sort or compare them
+- iso_date = 'YYYY-MM-DD' text, epoch_day = days since 1970-01-01 (integer)
+- year, month, week_of_year (ISO week) = integers derived from the date
+- minute_of_day = hour * 60 + minute (integer, 0-1439)
 
 RULES:
 1. Return ONLY the SQL query, no explanations
 2. Use proper SQLite syntax
-3. For customer counts: COUNT(DISTINCT ticket_number)
+3. For customer counts and ticket/basket metrics (average ticket, items per ticket) use the tickets table:
+   COUNT(*) FROM tickets, AVG(basket_total), AVG(item_count). Use sales only when filtering by product
 4. For product sales: SUM(quantity) GROUP BY product_name
+5. For date filters, ranges and ordering use iso_date (e.g. iso_date BETWEEN '2024-10-01' AND '2024-10-31'),
+   year/month/week_of_year for periods, and minute_of_day for time-of-day ranges (e.g. minute_of_day >= 12 * 60)
 
 Examples:
-"Cuantos clientes hay?" → SELECT COUNT(DISTINCT ticket_number) as total_clientes FROM sales;
+"Cuantos clientes hay?" → SELECT COUNT(*) as total_clientes FROM tickets;
+"Ticket promedio?" → SELECT AVG(basket_total) as ticket_promedio FROM tickets;
 "Total de ventas?" → SELECT SUM(total) as total_ventas FROM sales;
+"Ventas por mes en 2024?" → SELECT month, SUM(total) as total_ventas FROM sales WHERE year = 2024 GROUP BY month ORDER BY month;
 
 Question:"""
 
@@ -1,13 +1,34 @@
+import os
 import re
+import asyncio
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.database import get_session
+from app.backends import get_backend
+from app.backends.base import MAX_QUERY_RESULTS, MAX_RESULT_BYTES, QueryTimeout, limit_rows
+from app.columnar import execute_columnar
 from app.services.cache import cache_service, cache_result
+from app.services.rollups import rollup_hits
 
 logger = logging.getLogger(__name__)
 
+# Queries run on a bounded thread pool so a slow scan never blocks the
+# event loop (and with it /health and every other request of the worker).
+# Started per application lifespan, or on first use outside one
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "8"))
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Time limit in seconds per endpoint (0 = no limit)
+QUERY_TIMEOUTS = {
+    "ask": float(os.getenv("QUERY_TIMEOUT_ASK", "15")),
+    "query": float(os.getenv("QUERY_TIMEOUT_QUERY", "30")),
+    "stats": float(os.getenv("QUERY_TIMEOUT_STATS", "30")),
+}
+
+# Query outcomes reported by /stats (e.g. interrupted queries)
+query_metrics = Counter()
+
 def validate_sql_safety(sql: str) -> bool:
     """
     Validates that the SQL query is safe (only SELECT).
@@ -35,35 +56,62 @@ def validate_sql_safety(sql: str) -> bool:
     
     return True
 
+def _execute(sql: str, timeout: Optional[float] = None):
+    """
+    Executes the query on the fastest engine that can answer it: the
+    in-memory columnar store, or the configured query backend.
+    Returns the columns, rows (within the result caps), the engine/table
+    that served it and the cap that truncated the rows, if any.
+    """
+    columnar = execute_columnar(sql)
+    if columnar is not None:
+        columns, rows = columnar
+        rows, truncated_by = limit_rows(rows)
+        return columns, rows, "columnar", truncated_by
+    return get_backend().execute(sql, timeout)
+
 @cache_result(prefix="sql_query", ttl=300)
-async def run_query(sql: str) -> Dict[str, Any]:
+async def run_query(sql: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     """
     Executes query with automatic cache for scalability.
     Avoids re-executing identical queries for 5 minutes.
+    Raises QueryTimeout when it runs longer than `timeout` seconds.
     """
     logger.info(f"Executing SQL query: {sql[:50]}...")
     
-    session = get_session()
     try:
-        result = session.execute(text(sql))
-        columns = list(result.keys())
-        rows = result.fetchall()
+        loop = asyncio.get_running_loop()
+        columns, rows, served_by, truncated_by = await loop.run_in_executor(
+            start_query_executor(), _execute, sql, timeout
+        )
+        rollup_hits[served_by] += 1
         
         query_result = {
             "columns": columns,
-            "rows": [list(row) for row in rows]
+            "rows": rows,
+            "served_by": served_by,
+            "truncated": truncated_by is not None
         }
+        if truncated_by:
+            # Tell the client which cap cut the result short
+            query_result["truncated_by"] = truncated_by
+            query_result["max_rows"] = MAX_QUERY_RESULTS
+            query_result["max_bytes"] = MAX_RESULT_BYTES
+            query_metrics["truncated"] += 1
         
-        logger.info(f"Query executed successfully: {len(rows)} rows")
+        logger.info(f"Query executed successfully: {len(rows)} rows (served by {served_by})")
         return query_result
-        
+
+    except QueryTimeout as e:
+        query_metrics["timeouts"] += 1
+        logger.warning(f"Query interrupted: {e}: {sql[:50]}...")
+        raise
     except Exception as e:
         logger.error(f"Error executing query: {e}")
         raise
-    finally:
-        session.close()
 
-def run_query_paginated(sql: str, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
+async def run_query_paginated(sql: str, page: int = 1, page_size: int = 100,
+                              timeout: Optional[float] = None) -> Dict[str, Any]:
     """
     Executes query with pagination for large datasets.
     Improves scalability by avoiding loading all results.
@@ -78,7 +126,7 @@ def run_query_paginated(sql: str, page: int = 1, page_size: int = 100) -> Dict[s
     # Modify SQL to add LIMIT and OFFSET
     paginated_sql = f"{sql} LIMIT {page_size} OFFSET {offset}"
     
-    result = run_query(paginated_sql)
+    result = await run_query(paginated_sql, timeout=timeout)
     
     # Add pagination metadata
     result["pagination"] = {
@@ -89,6 +137,20 @@ def run_query_paginated(sql: str, page: int = 1, page_size: int = 100) -> Dict[s
     
     return result
 
+def start_query_executor() -> ThreadPoolExecutor:
+    """Returns the query thread pool, creating it when not running."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+    return _executor
+
+def shutdown_query_executor():
+    """Waits for running queries and stops the query threads."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
 @cache_result(prefix="stats", ttl=600)
 async def get_query_stats() -> Dict[str, List[Any]]:
     """
@@ -104,15 +166,15 @@ async def get_query_stats() -> Dict[str, List[Any]]:
         "unique_products": "SELECT COUNT(DISTINCT product_name) FROM sales",
         "date_range": """
             SELECT 
-                MIN(date) as earliest_date,
-                MAX(date) as latest_date
+                MIN(iso_date) as earliest_date,
+                MAX(iso_date) as latest_date
             FROM sales
         """
     }
     
     for stat_name, sql in stat_queries.items():
         try:
-            result = run_query(sql)
+            result = await run_query(sql, timeout=QUERY_TIMEOUTS["stats"])
             stats[stat_name] = result["rows"][0] if result["rows"] else [0]
         except Exception as e:
             logger.error(f"Error getting statistic {stat_name}: {e}")
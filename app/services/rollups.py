@@ -0,0 +1,160 @@
+"""
+Pre-aggregated rollup tables and the query rewrite that uses them.
+Rollups are rebuilt from the `sales` view after every load; run_query
+answers compatible aggregate queries from the smallest matching rollup.
+"""
+import re
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+
+from app.services.sql_shape import parse_aggregate_query, AggregateQuery
+
+logger = logging.getLogger(__name__)
+
+# Columns that identify the same grain (e.g. a date and its ISO form)
+_EQUIVALENT_COLUMNS = {
+    "iso_date": "date",
+    "epoch_day": "date",
+    "minute_of_day": "hour",
+}
+
+DATE_COLUMNS = ["date", "iso_date", "epoch_day", "year", "month", "week_of_year", "week_day"]
+
+class Rollup:
+    """
+    A pre-aggregated table grouped by `grain`. `columns` holds the grain
+    plus every column functionally determined by it, so they can be
+    filtered and grouped on without changing the result. `measures` maps
+    each recognized aggregate to the SQL that computes it from the table.
+    """
+
+    def __init__(self, name: str, grain: List[str], columns: List[str],
+                 measures: Dict[str, str], built: bool = True):
+        self.name = name
+        self.grain = grain
+        self.columns = columns
+        self.measures = measures
+        self.built = built  # False for tables maintained by the loader
+
+    def build_sql(self) -> str:
+        columns = ", ".join(self.columns)
+        return f"""
+            CREATE TABLE {self.name} AS
+            SELECT {columns},
+                   SUM(quantity) AS quantity_sum,
+                   SUM(total) AS total_sum,
+                   COUNT(*) AS row_count,
+                   COUNT(DISTINCT ticket_number) AS ticket_count
+            FROM sales
+            GROUP BY {columns}
+        """
+
+    def can_answer(self, query: AggregateQuery) -> bool:
+        if not query.columns <= set(self.columns):
+            return False
+        if not query.aggregates <= set(self.measures):
+            return False
+        if "count_tickets" in query.aggregates and "ticket_number" not in self.grain:
+            # Distinct counts do not add up across groups: only exact grain
+            group_columns = query.group_columns()
+            if group_columns is None or _canonical(group_columns) != _canonical(self.grain):
+                return False
+        return True
+
+# How each recognized aggregate is computed from a rollup's measures.
+# Counts are summed, and SUM over no rows is NULL where COUNT gives 0
+ROLLUP_MEASURES = {
+    "count_rows": "COALESCE(SUM(row_count), 0)",
+    "sum_quantity": "SUM(quantity_sum)",
+    "sum_total": "SUM(total_sum)",
+    "avg_quantity": "(SUM(quantity_sum) * 1.0 / SUM(row_count))",
+    "avg_total": "(SUM(total_sum) * 1.0 / SUM(row_count))",
+    "count_tickets": "COALESCE(SUM(ticket_count), 0)",
+}
+
+# The materialized tickets table has one row per ticket, so distinct
+# ticket counts become plain row counts at any grouping
+TICKET_MEASURES = {
+    "count_rows": "COALESCE(SUM(line_count), 0)",
+    "sum_quantity": "SUM(item_count)",
+    "sum_total": "SUM(basket_total)",
+    "avg_quantity": "(SUM(item_count) * 1.0 / SUM(line_count))",
+    "avg_total": "(SUM(basket_total) * 1.0 / SUM(line_count))",
+    "count_tickets": "COUNT(*)",
+}
+
+# Coarsest first, so the smallest matching table wins
+ROLLUPS = [
+    Rollup("rollup_daily", ["date"], DATE_COLUMNS, ROLLUP_MEASURES),
+    Rollup("rollup_weekday_hour", ["week_day", "hour"], ["week_day", "hour", "minute_of_day"], ROLLUP_MEASURES),
+    Rollup("rollup_daily_product", ["date", "product_name"], DATE_COLUMNS + ["product_name"], ROLLUP_MEASURES),
+    Rollup("tickets", ["ticket_number"],
+           ["ticket_number", "hour", "minute_of_day", "waiter"] + DATE_COLUMNS,
+           TICKET_MEASURES, built=False),
+]
+
+# Which table served each query, for /stats
+rollup_hits: Counter = Counter()
+
+def _canonical(columns: List[str]) -> set:
+    return {_EQUIVALENT_COLUMNS.get(column, column) for column in columns}
+
+def built_rollups() -> List[Rollup]:
+    """Rollups created by build_rollups (tickets is filled by the loader)."""
+    return [rollup for rollup in ROLLUPS if rollup.built]
+
+def build_rollups(session):
+    """(Re)creates every rollup table from the current sales data."""
+    for rollup in built_rollups():
+        session.execute(text(f"DROP TABLE IF EXISTS {rollup.name}"))
+        session.execute(text(rollup.build_sql()))
+    session.commit()
+    logger.info(f"Built rollups: {', '.join(rollup.name for rollup in built_rollups())}")
+
+def _rewrite_simple(sql: str) -> Tuple[str, Optional[str]]:
+    query = parse_aggregate_query(sql)
+    if query is None or query.table != "sales" or not query.is_aggregate:
+        return sql, None
+
+    for rollup in ROLLUPS:
+        if rollup.can_answer(query):
+            return query.render(rollup.name, rollup.measures), rollup.name
+    return sql, None
+
+def _subqueries(sql: str) -> List[Tuple[int, int]]:
+    """Spans of the innermost parenthesized `(SELECT ...)` subqueries."""
+    spans, stack = [], []
+    for position, char in enumerate(sql):
+        if char == "(":
+            stack.append(position)
+        elif char == ")" and stack:
+            start = stack.pop()
+            inner = sql[start + 1:position]
+            if re.match(r"\s*SELECT\b", inner, re.I) and not re.search(r"\(\s*SELECT\b", inner, re.I):
+                spans.append((start + 1, position))
+    return spans
+
+def rewrite_query(sql: str) -> Tuple[str, Optional[str]]:
+    """
+    Rewrites an aggregate query over `sales` to the smallest rollup that
+    can answer it. When the whole query is not recognized, each innermost
+    `(SELECT ... FROM sales ...)` subquery is tried on its own (e.g. the
+    per-ticket totals behind an average-ticket question).
+    Returns the SQL to run and the rollup name (None when unchanged).
+    """
+    rewritten, rollup = _rewrite_simple(sql)
+    if rollup:
+        return rewritten, rollup
+
+    used = []
+    # Replace from the end so earlier spans stay valid
+    for start, end in reversed(_subqueries(sql)):
+        inner, inner_rollup = _rewrite_simple(sql[start:end])
+        if inner_rollup:
+            sql = sql[:start] + inner + sql[end:]
+            used.append(inner_rollup)
+    if used:
+        return sql, ",".join(sorted(set(used)))
+    return sql, None
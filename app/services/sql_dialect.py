@@ -0,0 +1,210 @@
+"""
+Translation of the SQLite-flavoured SQL the LLM writes (and the rollup
+rewriter renders) into PostgreSQL and DuckDB. Covers the SQLite-only
+functions and syntax that show up in practice; anything else is passed
+through and reported by the database as usual.
+"""
+import re
+from typing import Callable, Dict, List, Optional
+
+from app.services.sql_shape import _STRING_LITERAL, _split_alias, _split_top_level
+
+# strftime directive -> to_char pattern
+_STRFTIME_FORMATS = {
+    "%Y": "YYYY", "%m": "MM", "%d": "DD", "%H": "HH24", "%M": "MI",
+    "%S": "SS", "%j": "DDD", "%W": "IW", "%%": "%",
+}
+
+DIALECTS = ("postgresql", "duckdb")
+
+def translate_sql(sql: str, dialect: str) -> str:
+    """Returns `sql` rewritten for `dialect` (unchanged for SQLite)."""
+    if dialect not in DIALECTS:
+        return sql
+
+    literals: Dict[str, str] = {}
+
+    def mask(match):
+        placeholder = f"__str{len(literals)}__"
+        literals[placeholder] = match.group(0)
+        return placeholder
+
+    masked = _STRING_LITERAL.sub(mask, sql)
+
+    def literal(arg: str):
+        """Python value of a masked string literal argument, or None."""
+        value = literals.get(arg.strip())
+        return value[1:-1].replace("''", "'") if value else None
+
+    def quote(value: str) -> str:
+        placeholder = f"__str{len(literals)}__"
+        literals[placeholder] = "'" + value.replace("'", "''") + "'"
+        return placeholder
+
+    def timestamp(arg: str) -> str:
+        return "CURRENT_TIMESTAMP" if literal(arg) == "now" else f"CAST({arg} AS TIMESTAMP)"
+
+    def strftime(args: List[str]):
+        fmt = literal(args[0])
+        if fmt is None or len(args) != 2:
+            return None
+        if fmt == "%w":
+            return f"CAST(EXTRACT(DOW FROM {timestamp(args[1])}) AS TEXT)"
+        pattern = re.sub(r"%.", lambda m: _STRFTIME_FORMATS.get(m.group(0), m.group(0)), fmt)
+        if "%" in pattern.replace("%%", ""):
+            return None
+        return f"TO_CHAR({timestamp(args[1])}, {quote(pattern)})"
+
+    def strftime_duckdb(args: List[str]):
+        # Same directives as SQLite, arguments the other way round
+        if literal(args[0]) is None or len(args) != 2:
+            return None
+        return f"STRFTIME({timestamp(args[1])}, {args[0]})"
+
+    def date(args: List[str]):
+        # SQLite's date() returns YYYY-MM-DD text, comparable with iso_date
+        value = "CURRENT_DATE" if literal(args[0]) == "now" else f"CAST({args[0]} AS DATE)"
+        for modifier in args[1:]:
+            modifier = literal(modifier)
+            if modifier is None or not re.fullmatch(r"[+-]?\d+ (?:day|month|year)s?", modifier):
+                return None
+            value = f"({value} + INTERVAL {quote(modifier.lstrip('+'))})"
+        if dialect == "duckdb":
+            return f"STRFTIME({value}, {quote('%Y-%m-%d')})"
+        return f"TO_CHAR({value}, {quote('YYYY-MM-DD')})"
+
+    def group_concat(args: List[str]):
+        distinct = re.match(r"\s*DISTINCT\s+", args[0], re.I)
+        expr = args[0][distinct.end():] if distinct else args[0]
+        separator = args[1] if len(args) > 1 else quote(",")
+        return f"STRING_AGG({'DISTINCT ' if distinct else ''}CAST({expr} AS TEXT), {separator})"
+
+    def round_(args: List[str]):
+        # PostgreSQL only rounds to n digits on NUMERIC
+        if len(args) != 2:
+            return None
+        return f"ROUND(CAST({args[0]} AS NUMERIC), {args[1]})"
+
+    rewrites: Dict[str, Callable[[List[str]], str]] = {
+        "date": date,
+        "julianday": lambda args: (
+            f"(EXTRACT(EPOCH FROM {timestamp(args[0])}) / 86400.0 + 2440587.5)" if len(args) == 1 else None
+        ),
+        "total": lambda args: f"COALESCE(SUM({args[0]}), 0.0)",
+    }
+    if dialect == "duckdb":
+        # DuckDB has SQLite's group_concat, ifnull, instr and round
+        rewrites["strftime"] = strftime_duckdb
+    else:
+        rewrites.update({
+            "strftime": strftime,
+            "group_concat": group_concat,
+            "round": round_,
+            "ifnull": lambda args: f"COALESCE({', '.join(args)})",
+            "instr": lambda args: f"STRPOS({', '.join(args)})",
+        })
+    for name, rewrite in rewrites.items():
+        masked = _rewrite_calls(masked, name, rewrite)
+
+    # SQLite's LIKE is case-insensitive; REAL is double precision there
+    masked = re.sub(r"\bLIKE\b", "ILIKE", masked, flags=re.I)
+    masked = re.sub(r"\bAS\s+REAL\b", "AS DOUBLE PRECISION", masked, flags=re.I)
+    # LIMIT offset, count
+    masked = re.sub(r"\bLIMIT\s+(\d+)\s*,\s*(\d+)", r"LIMIT \2 OFFSET \1", masked, flags=re.I)
+
+    for placeholder in sorted(literals, key=len, reverse=True):
+        masked = masked.replace(placeholder, literals[placeholder])
+    return masked
+
+def _rewrite_calls(sql: str, name: str, rewrite: Callable[[List[str]], str]) -> str:
+    """
+    Replaces every call `name(args)` (innermost first) with
+    rewrite(args); calls it returns None for are left unchanged.
+    """
+    pattern = re.compile(rf"\b{name}\s*\(", re.I)
+    position = 0
+    while True:
+        match = pattern.search(sql, position)
+        if not match:
+            return sql
+        end = _closing_paren(sql, match.end())
+        if end is None:
+            return sql
+        inner = _rewrite_calls(sql[match.end():end], name, rewrite)
+        replacement = rewrite(_split_top_level(inner))
+        if replacement is None:
+            replacement = sql[match.start():match.end()] + inner + ")"
+        sql = sql[:match.start()] + replacement + sql[end + 1:]
+        position = match.start() + len(replacement)
+
+def _closing_paren(sql: str, start: int):
+    depth = 1
+    for index in range(start, len(sql)):
+        if sql[index] == "(":
+            depth += 1
+        elif sql[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+_SELECT_LIST_END = re.compile(r"(?:FROM|UNION|INTERSECT|EXCEPT)\b", re.I)
+
+def sqlite_column_names(sql: str) -> Optional[List[str]]:
+    """
+    Column names SQLite reports for a query: the alias, the name of a
+    plain column reference, or else the expression as written. None
+    when the text does not tell (`*`, WITH queries).
+    """
+    literals: Dict[str, str] = {}
+
+    def mask(match):
+        placeholder = f"__str{len(literals)}__"
+        literals[placeholder] = match.group(0)
+        return placeholder
+
+    def unmask(text: str) -> str:
+        for placeholder in sorted(literals, key=len, reverse=True):
+            text = text.replace(placeholder, literals[placeholder])
+        return text
+
+    masked = _STRING_LITERAL.sub(mask, sql)
+    start = re.match(r"\s*SELECT\s+(?:(?:DISTINCT|ALL)\s+)?", masked, re.I)
+    if not start:
+        return None
+    # The select list ends at the first top-level FROM, set operator or ;
+    depth, end = 0, len(masked)
+    for index in range(start.end(), len(masked)):
+        char = masked[index]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and (char == ";" or (masked[index - 1] in " \t\r\n)"
+                                             and _SELECT_LIST_END.match(masked, index))):
+            end = index
+            break
+
+    names = []
+    for item in _split_top_level(masked[start.end():end]):
+        expr, alias = _split_alias(item)
+        if alias is None:
+            quoted_alias = re.match(r'^(?P<expr>.+?)\s+(?:AS\s+)?(?P<alias>"(?:[^"]|"")*")$', item, re.I | re.S)
+            if quoted_alias:
+                expr, alias = quoted_alias.group("expr"), quoted_alias.group("alias")
+        column = re.fullmatch(r'(?:\w+\.)?(?P<name>\w+|"(?:[^"]|"")*")', expr)
+        if alias is not None:
+            name = _unquote(unmask(alias))
+        elif expr == "*" or expr.endswith(".*"):
+            return None
+        elif column and not column.group("name").startswith("__str"):
+            name = _unquote(column.group("name"))
+        else:
+            name = unmask(expr)
+        names.append(name)
+    return names
+
+def _unquote(name: str) -> str:
+    if len(name) > 1 and name[0] in "\"'" and name[-1] == name[0]:
+        return name[1:-1].replace(name[0] * 2, name[0])
+    return name
@@ -0,0 +1,278 @@
+"""
+Lightweight recognizer for the single-table aggregate queries the LLM emits.
+It is not a SQL parser: anything it does not fully understand is reported
+as unrecognized (None) and the original SQL runs unchanged.
+"""
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_QUOTED_IDENTIFIER = re.compile(r'"(?:[^"]|"")*"')
+_IDENTIFIER = re.compile(r"\b[A-Za-z_]\w*\b")
+_QUERY = re.compile(r"""
+    ^\s*SELECT\s+(?P<distinct>DISTINCT\s+)?(?P<select>.+?)
+    \s+FROM\s+(?P<table>\w+)
+    (?:\s+WHERE\s+(?P<where>.+?))?
+    (?:\s+GROUP\s+BY\s+(?P<group>.+?))?
+    (?:\s+HAVING\s+(?P<having>.+?))?
+    (?:\s+ORDER\s+BY\s+(?P<order>.+?))?
+    (?:\s+LIMIT\s+(?P<limit>\d+)(?:\s+OFFSET\s+(?P<offset>\d+))?)?
+    \s*;?\s*$
+""", re.I | re.S | re.X)
+_ALIASED_ITEM = re.compile(r"^(?P<expr>.+?)\s+(?:AS\s+)?(?P<alias>\w+)$", re.I | re.S)
+
+# Aggregates over base columns that other engines know how to answer.
+# Canonical name -> pattern (matched case-insensitively).
+AGGREGATE_PATTERNS = {
+    "count_rows": r"COUNT\s*\(\s*(?:\*|1)\s*\)",
+    "count_tickets": r"COUNT\s*\(\s*DISTINCT\s+ticket_number\s*\)",
+    "sum_quantity": r"SUM\s*\(\s*quantity\s*\)",
+    "sum_total": r"SUM\s*\(\s*total\s*\)",
+    "avg_quantity": r"AVG\s*\(\s*quantity\s*\)",
+    "avg_total": r"AVG\s*\(\s*total\s*\)",
+}
+
+# Aggregates left after the known ones are replaced make the query unrecognized
+_OTHER_AGGREGATES = re.compile(r"\b(?:COUNT|SUM|AVG|TOTAL|GROUP_CONCAT|STRING_AGG)\s*\(", re.I)
+_MIN_MAX = re.compile(r"\b(?:MIN|MAX)\s*\(", re.I)
+_UNSUPPORTED = re.compile(r"\b(?:SELECT|JOIN|UNION|INTERSECT|EXCEPT|OVER|WITH)\b|\w\.\w", re.I)
+
+SQL_KEYWORDS = {
+    "AND", "OR", "NOT", "IN", "IS", "NULL", "LIKE", "GLOB", "BETWEEN", "CASE",
+    "WHEN", "THEN", "ELSE", "END", "AS", "ASC", "DESC", "DISTINCT", "COLLATE",
+    "NOCASE", "ESCAPE", "CAST", "INTEGER", "REAL", "TEXT", "NUMERIC", "TRUE",
+    "FALSE", "NULLS", "FIRST", "LAST",
+}
+
+class AggregateQuery:
+    """
+    A recognized `SELECT ... FROM <table> [WHERE] [GROUP BY] [HAVING]
+    [ORDER BY] [LIMIT]` query, with string literals masked and known
+    aggregates replaced by placeholders so it can be re-rendered against
+    another table.
+    """
+
+    def __init__(self, match, literals: Dict[str, str], aggregates: Dict[str, str],
+                 original_aggregates: Dict[str, str]):
+        self.table = match.group("table").lower()
+        self.distinct = bool(match.group("distinct"))
+        self.where = match.group("where")
+        self.group_by = _split_top_level(match.group("group")) if match.group("group") else []
+        self.having = match.group("having")
+        self.order_by = _split_top_level(match.group("order")) if match.group("order") else []
+        self.limit = int(match.group("limit")) if match.group("limit") else None
+        self.offset = int(match.group("offset")) if match.group("offset") else None
+        self._literals = literals
+        self._aggregates = aggregates  # placeholder -> canonical name
+        self._original_aggregates = original_aggregates  # placeholder -> source text
+        self.select_items: List[Tuple[str, Optional[str]]] = [
+            _split_alias(item) for item in _split_top_level(match.group("select"))
+        ]
+
+    @property
+    def aggregates(self) -> Set[str]:
+        """Canonical names of the aggregates used anywhere in the query."""
+        return set(self._aggregates.values())
+
+    @property
+    def aliases(self) -> Set[str]:
+        return {alias.lower() for _, alias in self.select_items if alias}
+
+    @property
+    def is_aggregate(self) -> bool:
+        """True when the query returns one row per group (or a single row)."""
+        if self.distinct:
+            return False
+        if self.group_by:
+            return True
+        # MIN/MAX of grouping columns are exact on any pre-aggregated table
+        return all(
+            self._placeholders_in(expr) or _MIN_MAX.search(expr)
+            for expr, _ in self.select_items
+        )
+
+    @property
+    def columns(self) -> Set[str]:
+        """Base columns referenced outside the recognized aggregates."""
+        clauses = [expr for expr, _ in self.select_items]
+        clauses += [self.where or ""]
+        # GROUP BY, HAVING and ORDER BY may also refer to select aliases
+        referable = self.group_by + [self.having or ""] + self.order_by
+        columns = set()
+        for clause in clauses:
+            columns |= _identifiers(clause)
+        for clause in referable:
+            columns |= _identifiers(clause) - self.aliases
+        return columns
+
+    def group_columns(self) -> Optional[List[str]]:
+        """
+        Base columns of GROUP BY when every entry is a plain column (or an
+        alias/position pointing at one); None for computed groupings.
+        """
+        columns = []
+        for expr in self.group_by:
+            expr = expr.strip()
+            if expr.isdigit() and 0 < int(expr) <= len(self.select_items):
+                expr = self.select_items[int(expr) - 1][0]
+            else:
+                for item_expr, alias in self.select_items:
+                    if alias and alias.lower() == expr.lower():
+                        expr = item_expr
+            if not re.fullmatch(r"[A-Za-z_]\w*", expr.strip()):
+                return None
+            columns.append(expr.strip().lower())
+        return columns
+
+    def render(self, table: str, aggregate_sql: Dict[str, str]) -> str:
+        """Re-renders the query against `table` with the given aggregate SQL."""
+        items = []
+        for expr, alias in self.select_items:
+            if alias:
+                items.append(f"{expr} AS {alias}")
+            elif self._placeholders_in(expr) or _MIN_MAX.search(expr):
+                # Keep the column name the original expression would produce
+                original = self._restore(expr).replace('"', '""')
+                items.append(f'{expr} AS "{original}"')
+            else:
+                items.append(expr)
+
+        sql = f"SELECT {', '.join(items)} FROM {table}"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        if self.group_by:
+            sql += f" GROUP BY {', '.join(self.group_by)}"
+        if self.having:
+            sql += f" HAVING {self.having}"
+        if self.order_by:
+            sql += f" ORDER BY {', '.join(self.order_by)}"
+        if self.limit is not None:
+            sql += f" LIMIT {self.limit}"
+            if self.offset is not None:
+                sql += f" OFFSET {self.offset}"
+
+        for placeholder, name in self._aggregates.items():
+            sql = sql.replace(placeholder, aggregate_sql[name])
+        return self._unmask(sql)
+
+    def aggregate_of(self, expr: str) -> Optional[str]:
+        """Canonical aggregate name when `expr` is exactly one recognized aggregate."""
+        return self._aggregates.get(expr.strip())
+
+    def output_name(self, expr: str, alias: Optional[str]) -> str:
+        """Column name SQLite reports for a select item."""
+        if alias:
+            name = self._unmask(alias)
+            if name[:1] in "\"'" and name[-1:] == name[:1]:
+                name = name[1:-1].replace(name[0] * 2, name[0])
+            return name
+        return self._restore(expr)
+
+    def literal(self, token: str) -> Optional[str]:
+        """Value of a masked string literal token, or None."""
+        literal = self._literals.get(token.strip())
+        if literal is None or not literal.startswith("'"):
+            return None
+        return literal[1:-1].replace("''", "'")
+
+    def _placeholders_in(self, expr: str) -> List[str]:
+        return [placeholder for placeholder in self._aggregates if placeholder in expr]
+
+    def _restore(self, expr: str) -> str:
+        """Original text of an expression (aggregates and literals restored)."""
+        for placeholder, original in self._original_aggregates.items():
+            expr = expr.replace(placeholder, original)
+        return self._unmask(expr)
+
+    def _unmask(self, sql: str) -> str:
+        for placeholder, literal in self._literals.items():
+            sql = sql.replace(placeholder, literal)
+        return sql
+
+def _split_top_level(text: str) -> List[str]:
+    """Splits on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+    parts.append(current.strip())
+    return parts
+
+def _split_alias(item: str) -> Tuple[str, Optional[str]]:
+    """Separates `expr [AS] alias` into its parts."""
+    match = _ALIASED_ITEM.match(item)
+    if not match:
+        return item, None
+    expr, alias = match.group("expr").strip(), match.group("alias")
+    # `a + b` or `CASE ... END` are expressions, not aliased items
+    if alias.upper() in SQL_KEYWORDS or expr[-1] in "+-*/%|=<>(,":
+        return item, None
+    return expr, alias
+
+def _identifiers(clause: str) -> Set[str]:
+    """Column-like identifiers of a masked clause (lowercased)."""
+    found = set()
+    for match in _IDENTIFIER.finditer(clause):
+        name = match.group(0)
+        if name.startswith("__") or name.upper() in SQL_KEYWORDS:
+            continue
+        # Function names are followed by an opening parenthesis
+        if clause[match.end():].lstrip().startswith("("):
+            continue
+        found.add(name.lower())
+    return found
+
+def parse_aggregate_query(sql: str) -> Optional[AggregateQuery]:
+    """Recognizes a simple single-table query, or returns None."""
+    literals: Dict[str, str] = {}
+
+    def mask(prefix):
+        def replace(match):
+            # Repeated text (e.g. an alias used in ORDER BY) shares a placeholder
+            for placeholder, literal in literals.items():
+                if literal == match.group(0):
+                    return placeholder
+            placeholder = f"__{prefix}{len(literals)}__"
+            literals[placeholder] = match.group(0)
+            return placeholder
+        return replace
+
+    masked = _STRING_LITERAL.sub(mask("lit"), sql)
+    # Quoted identifiers are only accepted as aliases
+    masked = _QUOTED_IDENTIFIER.sub(mask("litq"), masked)
+
+    aggregates: Dict[str, str] = {}
+    original_aggregates: Dict[str, str] = {}
+    for name, pattern in AGGREGATE_PATTERNS.items():
+        def replace(match, name=name):
+            placeholder = f"__agg{len(aggregates)}__"
+            aggregates[placeholder] = name
+            original_aggregates[placeholder] = match.group(0)
+            return placeholder
+        masked = re.sub(pattern, replace, masked, flags=re.I)
+
+    body = re.sub(r"^\s*SELECT\b", "", masked, flags=re.I)
+    if _UNSUPPORTED.search(body) or _OTHER_AGGREGATES.search(masked):
+        return None
+
+    match = _QUERY.match(masked)
+    if not match:
+        return None
+
+    query = AggregateQuery(match, literals, aggregates, original_aggregates)
+    if any(expr.strip() == "*" for expr, _ in query.select_items):
+        return None
+
+    # A quoted identifier that is not a select alias may name a base column
+    aliases = {alias for _, alias in query.select_items if alias}
+    for placeholder in literals:
+        if placeholder.startswith("__litq") and placeholder not in aliases:
+            return None
+    return query
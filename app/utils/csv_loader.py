@@ -1,62 +1,677 @@
+import io
+import os
 import csv
+import time
+import queue
+import hashlib
 import logging
-from typing import Iterator, List, Dict, Any
-from sqlalchemy import text
-from app.database import get_session
-from app.models import Sale
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+from sqlalchemy import bindparam, inspect, text
+from app.database import bulk_load_connection, get_session, get_meta, set_meta, bump_data_version
+from app.models import SaleFact, MANAGED_INDEXES
+from app.services.rollups import build_rollups, built_rollups
+from app.utils.snapshot import (
+    SnapshotWriter, csv_content_hash, find_snapshot, read_snapshot_chunks, read_snapshot_tables,
+    snapshot_enabled
+)
+from app.utils.arrow_ingest import (
+    PYARROW_AVAILABLE, append_int64, dimension_ids, read_csv_tables, read_stream_tables, table_csv,
+    table_rows
+)
+from app.utils.sources import expand_sources, is_multi_source, open_source
 
 logger = logging.getLogger(__name__)
 
-def load_csv_streaming(csv_path: str, batch_size: int = 1000):
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+CSV_BATCH_SIZE = int(os.getenv("CSV_BATCH_SIZE", "1000"))
+
+# Ingest engine: "python" (csv module, one dict per row) or "arrow"
+# (typed Arrow column chunks, vectorized derivation and inserts)
+CSV_INGEST_ENGINE = os.getenv("CSV_INGEST_ENGINE", "python").lower()
+
+# How fact rows reach SQLite: "safe" (SQLAlchemy executemany of dicts),
+# "dbapi" (sqlite3 cursor executemany of tuples) or "bulk" (dbapi, plus
+# BULK_LOAD_PRAGMAS while a cold load builds the database). bulk turns
+# journaling off on a file that may be serving queries, so it is opt-in
+# for builds of a fresh or scratch database.
+CSV_LOAD_MODE = os.getenv("CSV_LOAD_MODE", "dbapi").lower()
+LOAD_MODES = ("safe", "dbapi", "bulk")
+
+# Parallel parsing: with more than one worker the file is split into
+# line-aligned byte ranges of about PARSE_CHUNK_BYTES, parsed in worker
+# processes and fed in file order to the single database writer
+CSV_PARSE_WORKERS = int(os.getenv("CSV_PARSE_WORKERS", "1"))
+PARSE_CHUNK_BYTES = int(os.getenv("PARSE_CHUNK_BYTES", str(4 * 1024 * 1024)))
+
+# Files of a multi-file source decompressed and parsed at the same time
+CSV_SOURCE_WORKERS = int(os.getenv("CSV_SOURCE_WORKERS", "4"))
+
+# Checkpointed cold loads (0 = off): commit every CSV_CHECKPOINT_BATCHES
+# batches with the file position, so an interrupted load resumes there,
+# and quarantine rows that fail validation instead of aborting
+CSV_CHECKPOINT_BATCHES = int(os.getenv("CSV_CHECKPOINT_BATCHES", "0"))
+
+def load_csv_streaming(csv_path: str, batch_size: int = CSV_BATCH_SIZE,
+                       content_hash: Optional[str] = None, engine=None,
+                       workers: int = CSV_PARSE_WORKERS, ingest: str = CSV_INGEST_ENGINE,
+                       load_mode: str = CSV_LOAD_MODE) -> str:
     """
     Loads CSV using streaming by chunks for scalability.
     Does not load the entire file into memory at once.
+    Reads the columnar snapshot instead when one matches the file's
+    hash, and writes it otherwise. Returns the source used.
+    `engine` defaults to the application's writer engine; `ingest`
+    and `load_mode` pick the ingest engine and insert strategy (see
+    CSV_INGEST_ENGINE and CSV_LOAD_MODE).
     """
-    logger.info(f"Starting streaming load of {csv_path} with batch_size={batch_size}")
-    
+    logger.info(
+        f"Starting streaming load of {csv_path} with batch_size={batch_size}, "
+        f"ingest={ingest}, load_mode={load_mode}"
+    )
+    arrow = _use_arrow(ingest)
+    raw = _use_dbapi(load_mode)
+    started = time.perf_counter()
+    content_hash = content_hash or csv_content_hash(csv_path)
+
     total_records = 0
-    session = get_session()
-    
+    inserted = 0
+    fingerprints = _RowFingerprints()
+    stack = ExitStack()
+    session = None
+    snapshot = find_snapshot(csv_path, content_hash)
+    # End of the ingested data in the file, recorded as the watermark
+    position = {"end": os.path.getsize(csv_path)}
+    writer = None
+    if snapshot:
+        source = "snapshot"
+        batches = (read_snapshot_tables if arrow else read_snapshot_chunks)(snapshot, batch_size)
+        logger.info(f"Reading rows from snapshot {snapshot}")
+    else:
+        source = "csv"
+        batches = _csv_chunks(csv_path, batch_size, position=position, workers=workers, ingest=ingest)
+        if snapshot_enabled():
+            writer = SnapshotWriter(csv_path, content_hash)
+
     try:
+        # The load PRAGMAs are per connection: the whole build runs on one
+        bind = stack.enter_context(bulk_load_connection(engine)) if load_mode == "bulk" else engine
+        session = get_session(bind)
+        stack.callback(session.close)
+        dimensions = _load_dimensions(session)
+
+        # Indexes are rebuilt once at the end, not maintained per insert
+        drop_indexes(session)
+
         # Process file in chunks without loading everything into memory
-        for batch in _read_csv_chunks(csv_path, batch_size):
-            _bulk_insert_batch(session, batch)
+        insert = _bulk_insert_table if arrow else _bulk_insert_batch
+        for batch in batches:
+            if writer:
+                writer.write(batch)
+            inserted += insert(session, fingerprints.add(batch), dimensions, raw)
             total_records += len(batch)
             logger.info(f"Processed {total_records} records...")
         
         session.commit()
-        logger.info(f"Load completed: {total_records} records processed")
+        logger.info(
+            f"Load completed: {total_records} records processed, "
+            f"{total_records - inserted} duplicates skipped"
+        )
+
+        build_indexes(session)
+        materialize_tickets(session)
+        build_rollups(session)
+
+        # Recorded last: an interrupted load is detected and redone
+        set_meta(session, "csv_sha256", content_hash)
+        _set_watermark(session, csv_path, position["end"])
+        bump_data_version(session)
+        session.commit()
+        if writer:
+            writer.close()
+        logger.info(
+            f"Cold load: {total_records} rows from {source} in "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+        return source
         
     except Exception as e:
-        session.rollback()
+        if session is not None:
+            session.rollback()
+        if writer:
+            writer.abort()
         logger.error(f"Error during load: {e}")
         raise
+    finally:
+        stack.close()
+
+def load_csv_delta(csv_path: str, start_offset: int, batch_size: int = CSV_BATCH_SIZE,
+                   content_hash: Optional[str] = None, engine=None,
+                   workers: int = CSV_PARSE_WORKERS, ingest: str = CSV_INGEST_ENGINE,
+                   load_mode: str = CSV_LOAD_MODE) -> str:
+    """
+    Ingests only the rows appended to the file after `start_offset` (the
+    watermark), then refreshes the affected tickets and the rollups.
+    Indexes stay in place and the load PRAGMAs are not used: deltas
+    are small next to the loaded data.
+    """
+    logger.info(f"Starting delta load of {csv_path} from byte {start_offset}")
+    started = time.perf_counter()
+    content_hash = content_hash or csv_content_hash(csv_path)
+    insert = _bulk_insert_table if _use_arrow(ingest) else _bulk_insert_batch
+    raw = _use_dbapi(load_mode)
+
+    total_records = 0
+    inserted = 0
+    fingerprints = _RowFingerprints()
+    session = get_session(engine)
+    position = {"end": start_offset}
+    try:
+        dimensions = _load_dimensions(session)
+        last_id = session.execute(text("SELECT COALESCE(MAX(id), 0) FROM sales_fact")).scalar()
+
+        for batch in _csv_chunks(csv_path, batch_size, start_offset, position, workers, ingest):
+            # Repeats of a line are numbered across the whole file
+            fingerprints.restore_tickets(session, batch)
+            inserted += insert(session, fingerprints.add(batch), dimensions, raw)
+            total_records += len(batch)
+        session.commit()
+
+        if inserted:
+            materialize_tickets(session, after_id=last_id)
+            build_rollups(session)
+
+        set_meta(session, "csv_sha256", content_hash)
+        _set_watermark(session, csv_path, position["end"])
+        if inserted:
+            bump_data_version(session)
+        session.commit()
+        logger.info(
+            f"Warm load: {inserted} new rows (bytes {start_offset}-{position['end']}, "
+            f"{total_records - inserted} duplicates skipped) in {time.perf_counter() - started:.2f}s"
+        )
+        return "delta"
+
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error during delta load: {e}")
+        raise
+    finally:
+        session.close()
+
+def load_csv_checkpointed(csv_path: str, batch_size: int = CSV_BATCH_SIZE,
+                          content_hash: Optional[str] = None, engine=None,
+                          checkpoint_batches: int = CSV_CHECKPOINT_BATCHES,
+                          load_mode: str = CSV_LOAD_MODE) -> str:
+    """
+    Cold load that survives interruptions. Every `checkpoint_batches`
+    batches the inserted rows are committed together with the byte
+    offset and batch id reached (ingest_progress); when the load of the
+    same file content was interrupted, it continues from that checkpoint.
+    Rows that fail validation are stored in quarantined_rows instead of
+    failing the load. The file is read serially by line (to know the
+    offsets) and without the bulk PRAGMAs, which are not crash safe.
+    Returns "csv", or "resumed" when it continued an earlier load.
+    """
+    started = time.perf_counter()
+    content_hash = content_hash or csv_content_hash(csv_path)
+    raw = _use_dbapi(load_mode)
+    checkpoint_batches = max(1, checkpoint_batches)
+
+    session = get_session(engine)
+    writer = None
+    try:
+        dimensions = _load_dimensions(session)
+        fingerprints = _RowFingerprints()
+        progress = _checkpoint(session, content_hash)
+        if progress:
+            batch_id, offset, inserted, quarantined = progress
+            # Repeats of a line are numbered across the whole file
+            fingerprints.restore(session)
+            logger.info(
+                f"Resuming load of {csv_path} after batch {batch_id} "
+                f"(byte {offset}, {inserted} rows, {quarantined} quarantined)"
+            )
+        else:
+            batch_id, offset, inserted, quarantined = 0, 0, 0, 0
+            session.execute(text("DELETE FROM quarantined_rows WHERE sha256 = :sha256"),
+                            {"sha256": content_hash})
+            drop_indexes(session)
+            if snapshot_enabled():
+                writer = SnapshotWriter(csv_path, content_hash)
+            logger.info(f"Starting checkpointed load of {csv_path} every {checkpoint_batches} batches")
+        checkpointed = batch_id
+
+        position = {"end": offset}
+        for rows, rejected, end in _read_csv_checkpoint_chunks(csv_path, batch_size, offset, position):
+            if rows:
+                if writer:
+                    writer.write(rows)
+                inserted += _bulk_insert_batch(session, fingerprints.add(rows), dimensions, raw)
+            if rejected:
+                _quarantine(session, csv_path, content_hash, rejected)
+                quarantined += len(rejected)
+            batch_id += 1
+            if batch_id % checkpoint_batches == 0:
+                _save_checkpoint(session, csv_path, content_hash, batch_id, end, inserted, quarantined)
+                session.commit()
+                checkpointed = batch_id
+                logger.info(f"Checkpoint at batch {batch_id}: {inserted} rows, byte {end}")
+        _save_checkpoint(session, csv_path, content_hash, batch_id, position["end"], inserted, quarantined)
+        session.commit()
+        checkpointed = batch_id
+
+        build_indexes(session)
+        materialize_tickets(session)
+        build_rollups(session)
+
+        set_meta(session, "csv_sha256", content_hash)
+        _set_watermark(session, csv_path, position["end"])
+        bump_data_version(session)
+        session.execute(text("DELETE FROM ingest_progress WHERE sha256 = :sha256"), {"sha256": content_hash})
+        session.commit()
+        if writer:
+            writer.close()
+        if quarantined:
+            logger.warning(f"{quarantined} invalid rows of {csv_path} were stored in quarantined_rows")
+        logger.info(
+            f"Cold load: {inserted} rows from csv in {batch_id} batches "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return "resumed" if progress else "csv"
+
+    except Exception as e:
+        session.rollback()
+        if writer:
+            writer.abort()
+        logger.error(f"Error during load: {e} (a restart resumes after batch {checkpointed})")
+        raise
+    finally:
+        session.close()
+
+def _checkpoint(session, content_hash: str) -> Optional[Tuple[int, int, int, int]]:
+    """(batch_id, byte_offset, row_count, quarantined) of an interrupted load of this content."""
+    row = session.execute(
+        text("SELECT batch_id, byte_offset, row_count, quarantined FROM ingest_progress "
+             "WHERE sha256 = :sha256"),
+        {"sha256": content_hash}
+    ).first()
+    return tuple(row) if row else None
+
+def _save_checkpoint(session, csv_path: str, content_hash: str, batch_id: int, offset: int,
+                     row_count: int, quarantined: int):
+    """Records the load's position (committed by the caller, with the rows)."""
+    session.execute(text("DELETE FROM ingest_progress WHERE sha256 = :sha256"), {"sha256": content_hash})
+    session.execute(
+        text("INSERT INTO ingest_progress (sha256, path, batch_id, byte_offset, row_count, quarantined, "
+             "updated_at) VALUES (:sha256, :path, :batch_id, :byte_offset, :row_count, :quarantined, "
+             ":updated_at)"),
+        {"sha256": content_hash, "path": csv_path, "batch_id": batch_id, "byte_offset": offset,
+         "row_count": row_count, "quarantined": quarantined,
+         "updated_at": datetime.now(timezone.utc).isoformat()}
+    )
+
+def _quarantine(session, csv_path: str, content_hash: str, rejected: List[Tuple[int, str, str]]):
+    """Stores rejected (offset, line, error) rows."""
+    quarantined_at = datetime.now(timezone.utc).isoformat()
+    session.execute(
+        text("INSERT INTO quarantined_rows (sha256, path, byte_offset, line, error, quarantined_at) "
+             "VALUES (:sha256, :path, :byte_offset, :line, :error, :quarantined_at)"),
+        [{"sha256": content_hash, "path": csv_path, "byte_offset": offset, "line": line,
+          "error": error, "quarantined_at": quarantined_at} for offset, line, error in rejected]
+    )
+
+def pending_sources(session, source: str) -> List[Tuple[str, str]]:
+    """(path, sha256) of the files of `source` not ingested yet."""
+    paths = expand_sources(source)
+    if not paths:
+        raise FileNotFoundError(f"No .csv, .csv.gz or .csv.zst files in {source}")
+    seen = set(session.execute(text("SELECT sha256 FROM ingested_files")).scalars())
+    pending = []
+    for path in paths:
+        checksum = csv_content_hash(path)
+        if checksum in seen:
+            continue
+        # The same file under two names is loaded once
+        seen.add(checksum)
+        pending.append((path, checksum))
+    return pending
+
+def load_csv_sources(source: str, batch_size: int = CSV_BATCH_SIZE, engine=None,
+                     workers: int = CSV_SOURCE_WORKERS, ingest: str = CSV_INGEST_ENGINE,
+                     load_mode: str = CSV_LOAD_MODE) -> List[Dict[str, Any]]:
+    """
+    Loads the files of a directory or glob (see app.utils.sources) that
+    were not ingested yet, decompressing and parsing up to `workers`
+    files at a time while this thread inserts their batches. The new
+    files are committed together with their checksums, so an interrupted
+    run is redone as a whole. Rows already loaded from an overlapping
+    file are skipped. Returns per-file throughput and skipped rows.
+    """
+    started = time.perf_counter()
+    arrow = _use_arrow(ingest)
+    raw = _use_dbapi(load_mode)
+    insert = _bulk_insert_table if arrow else _bulk_insert_batch
+
+    session = get_session(engine)
+    try:
+        pending = pending_sources(session, source)
+        if not pending:
+            logger.info(f"All files in {source} already ingested")
+            return []
+        logger.info(f"Ingesting {len(pending)} new files from {source}")
+
+        dimensions = _load_dimensions(session)
+        last_id = session.execute(text("SELECT COALESCE(MAX(id), 0) FROM sales_fact")).scalar()
+        # Into an empty table the indexes are built once at the end
+        cold = last_id == 0
+        if cold:
+            drop_indexes(session)
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        skipped = dict.fromkeys((path for path, _ in pending), 0)
+        total_records = 0
+        for path, batch in _parse_sources([path for path, _ in pending], batch_size, workers, ingest, stats):
+            skipped[path] += len(batch) - insert(session, batch, dimensions, raw)
+            total_records += len(batch)
+
+        loaded_at = datetime.now(timezone.utc).isoformat()
+        session.execute(
+            text("INSERT INTO ingested_files (sha256, path, row_count, loaded_at) "
+                 "VALUES (:sha256, :path, :row_count, :loaded_at)"),
+            [{"sha256": checksum, "path": path, "row_count": stats[path]["rows"], "loaded_at": loaded_at}
+             for path, checksum in pending]
+        )
+        session.commit()
+
+        if cold:
+            build_indexes(session)
+        materialize_tickets(session, after_id=None if cold else last_id)
+        build_rollups(session)
+        bump_data_version(session)
+        session.commit()
+
+        for path, _ in pending:
+            file_stats = stats[path]
+            file_stats["skipped"] = skipped[path]
+            logger.info(
+                f"Ingested {path}: {file_stats['rows']} rows ({file_stats['skipped']} duplicates skipped), "
+                f"{file_stats['bytes'] / 1e6:.1f} MB in {file_stats['seconds']:.2f}s "
+                f"({file_stats['rows_per_s']:,.0f} rows/s)"
+            )
+        logger.info(
+            f"Loaded {total_records} rows from {len(pending)} files of {source} "
+            f"({sum(skipped.values())} duplicates skipped) in {time.perf_counter() - started:.2f}s"
+        )
+        return [stats[path] for path, _ in pending]
+
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error during load of {source}: {e}")
+        raise
     finally:
         session.close()
 
-def _read_csv_chunks(csv_path: str, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+def _parse_sources(paths: List[str], batch_size: int, workers: int, ingest: str,
+                   stats: Dict[str, Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """
+    (path, batch) pairs from several files parsed by a pool of threads
+    (gzip, zstd and Arrow release the GIL while they work). A bounded
+    queue applies backpressure when the writer falls behind. Rows are
+    fingerprinted per file, so repeats are numbered in file order
+    however the files interleave. Fills `stats` per file.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=workers * 4)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def parse(path: str):
+        file_started = time.perf_counter()
+        fingerprints = _RowFingerprints()
+        rows = 0
+        try:
+            with open_source(path) as stream:
+                chunks = read_stream_tables(stream, batch_size) if ingest == "arrow" \
+                    else _read_stream_chunks(stream, batch_size)
+                for batch in chunks:
+                    if not put((path, fingerprints.add(batch))):
+                        return
+                    rows += len(batch)
+        except Exception as e:
+            logger.error(f"Error reading {path}: {e}")
+            put(e)
+            return
+        seconds = time.perf_counter() - file_started
+        stats[path] = {
+            "path": path, "rows": rows, "bytes": os.path.getsize(path),
+            "seconds": seconds, "rows_per_s": rows / seconds if seconds else 0.0,
+        }
+        put(finished)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="csv-source") as executor:
+        for path in paths:
+            executor.submit(parse, path)
+        try:
+            remaining = len(paths)
+            while remaining:
+                item = batches.get()
+                if item is finished:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+
+def _read_stream_chunks(stream, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Batches of parsed rows from an open binary stream at the header."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    batch = []
+    for row in reader:
+        batch.append(_process_row(row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _prefix_hash(csv_path: str, offset: int) -> str:
+    """SHA-256 of the first `offset` bytes of the file."""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as file:
+        remaining = offset
+        while remaining:
+            block = file.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+def _set_watermark(session, csv_path: str, offset: int):
+    """Records how far into the file the data has been ingested."""
+    set_meta(session, "watermark_offset", offset)
+    set_meta(session, "watermark_prefix_sha256", _prefix_hash(csv_path, offset))
+
+def _valid_watermark(session, csv_path: str) -> Optional[int]:
+    """
+    Offset to resume from when the file only grew since the last load:
+    every byte before the watermark must be unchanged. None otherwise.
+    """
+    offset = get_meta(session, "watermark_offset")
+    if offset is None or int(offset) > os.path.getsize(csv_path):
+        return None
+    offset = int(offset)
+    if _prefix_hash(csv_path, offset) != get_meta(session, "watermark_prefix_sha256"):
+        return None
+    return offset
+
+@lru_cache(maxsize=4096)
+def _derive_date_columns(raw_date: str) -> Dict[str, Any]:
+    """
+    Derives typed date columns from a MM/DD/YYYY string.
+    Cached because a file only has a few hundred distinct dates.
+    """
+    month, day, year = (int(part) for part in raw_date.split('/'))
+    parsed = date(year, month, day)
+    return {
+        'iso_date': parsed.isoformat(),
+        'epoch_day': parsed.toordinal() - EPOCH_ORDINAL,
+        'year': year,
+        'month': month,
+        'week_of_year': parsed.isocalendar()[1]
+    }
+
+def _minute_of_day(raw_hour: str) -> int:
+    """Converts HH:MM into minutes since midnight."""
+    hours, minutes = raw_hour.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def _process_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Validates and types one CSV row, adding the derived columns."""
+    return {
+        'date': row['date'],
+        'week_day': row['week_day'],
+        'hour': row['hour'],
+        'ticket_number': row['ticket_number'],
+        'waiter': int(row['waiter']),
+        'product_name': row['product_name'],
+        'quantity': float(row['quantity']),
+        'unitary_price': float(row['unitary_price']),
+        'total': float(row['total']),
+        'minute_of_day': _minute_of_day(row['hour']),
+        **_derive_date_columns(row['date'])
+    }
+
+# Row values identifying a sale; date and hour in their normalized forms
+FINGERPRINT_COLUMNS = ["iso_date", "minute_of_day", "ticket_number", "product_name", "quantity", "total"]
+_fingerprint_values = itemgetter(*FINGERPRINT_COLUMNS)
+
+def _digest(key: str) -> int:
+    """Signed 64-bit hash of a key (fits BIGINT and SQLite INTEGER)."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
+
+class _RowFingerprints:
+    """
+    Fingerprints the rows of one load (a file, a delta or an upload).
+    POS exports repeat identical lines on a ticket (the same item rung
+    twice), so the nth repeat within the load gets a fingerprint of its
+    own: re-loading an overlapping export then maps every row onto the
+    one already stored. Repeats are counted per load; a delta load first
+    counts the stored rows of the tickets it touches (restore_tickets),
+    so an identical line appended to a loaded ticket is numbered after
+    them, as a full reload of the file would.
+    """
+
+    def __init__(self):
+        self._seen: Dict[int, int] = {}
+        self._restored_tickets = set()
+
+    def _fingerprint(self, iso_date, minute_of_day, ticket_number, product_name, quantity, total) -> int:
+        key = f"{iso_date}\x1f{minute_of_day}\x1f{ticket_number}\x1f{product_name}\x1f{quantity}\x1f{total}"
+        base = _digest(key)
+        repeats = self._seen.get(base, 0)
+        self._seen[base] = repeats + 1
+        return _digest(f"{key}\x1f{repeats}") if repeats else base
+
+    def restore(self, session):
+        """Counts the rows already stored, to continue an interrupted load."""
+        for values in session.execute(text(f"SELECT {', '.join(FINGERPRINT_COLUMNS)} FROM sales")):
+            self._fingerprint(*values)
+
+    def restore_tickets(self, session, batch):
+        """
+        Counts the stored rows of the batch's tickets not seen yet in this
+        load, before any of their new rows are fingerprinted.
+        """
+        ticket_numbers = (
+            [row["ticket_number"] for row in batch] if isinstance(batch, list)
+            else batch["ticket_number"].to_pylist()
+        )
+        new_tickets = [number for number in dict.fromkeys(ticket_numbers)
+                       if number not in self._restored_tickets]
+        if not new_tickets:
+            return
+        self._restored_tickets.update(new_tickets)
+        for values in session.execute(
+            text(f"SELECT {', '.join(FINGERPRINT_COLUMNS)} FROM sales WHERE ticket_number IN :tickets")
+            .bindparams(bindparam("tickets", expanding=True)),
+            {"tickets": new_tickets}
+        ):
+            self._fingerprint(*values)
+
+    def add(self, batch):
+        """Adds the fingerprint column to a batch of rows or an Arrow table."""
+        if isinstance(batch, list):
+            for row in batch:
+                row["fingerprint"] = self._fingerprint(*_fingerprint_values(row))
+            return batch
+        return append_int64(batch, "fingerprint", [
+            self._fingerprint(*values) for values in table_rows(batch.select(FINGERPRINT_COLUMNS))
+        ])
+
+def _use_arrow(ingest: str) -> bool:
+    """Validates an ingest engine name; True for the Arrow engine."""
+    if ingest not in ("python", "arrow"):
+        raise ValueError(f"Unknown CSV_INGEST_ENGINE '{ingest}', expected 'python' or 'arrow'")
+    if ingest == "arrow" and not PYARROW_AVAILABLE:
+        raise RuntimeError("CSV_INGEST_ENGINE=arrow requires pyarrow")
+    return ingest == "arrow"
+
+def _use_dbapi(load_mode: str) -> bool:
+    """Validates a load mode; True when rows go through the sqlite3 cursor."""
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Unknown CSV_LOAD_MODE '{load_mode}', expected one of {list(LOAD_MODES)}")
+    return load_mode != "safe"
+
+def _csv_chunks(csv_path: str, batch_size: int, start_offset: int = 0,
+                position: Optional[Dict[str, int]] = None,
+                workers: int = CSV_PARSE_WORKERS, ingest: str = "python"):
+    """
+    Batches of parsed rows, read serially or by `workers` processes, or
+    Arrow tables with the arrow engine (which parallelizes on its own).
+    """
+    if _use_arrow(ingest):
+        return read_csv_tables(csv_path, batch_size, start_offset, position)
+    if workers > 1:
+        return _read_csv_chunks_parallel(csv_path, batch_size, workers, start_offset, position)
+    return _read_csv_chunks(csv_path, batch_size, start_offset, position)
+
+def _read_csv_chunks(csv_path: str, batch_size: int, start_offset: int = 0,
+                     position: Optional[Dict[str, int]] = None) -> Iterator[List[Dict[str, Any]]]:
     """
     Reads CSV in chunks without loading the entire file into memory.
     Generates batches of records for efficient processing.
+    Starts at byte `start_offset` (a line boundary) when given, and
+    stores the byte offset where reading ended in `position["end"]`.
     """
-    with open(csv_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+    with open(csv_path, 'rb') as raw:
+        fieldnames = next(csv.reader([raw.readline().decode('utf-8')]))
+        if start_offset:
+            raw.seek(start_offset)
+        file = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        reader = csv.DictReader(file, fieldnames=fieldnames)
         batch = []
         
         for row in reader:
-            # Process and validate each row
-            processed_row = {
-                'date': row['date'],
-                'week_day': row['week_day'], 
-                'hour': row['hour'],
-                'ticket_number': row['ticket_number'],
-                'waiter': int(row['waiter']),
-                'product_name': row['product_name'],
-                'quantity': float(row['quantity']),
-                'unitary_price': float(row['unitary_price']),
-                'total': float(row['total'])
-            }
-            batch.append(processed_row)
+            batch.append(_process_row(row))
             
             # Send batch when it reaches desired size
             if len(batch) >= batch_size:
@@ -66,39 +681,448 @@ def _read_csv_chunks(csv_path: str, batch_size: int) -> Iterator[List[Dict[str,
         # Send final batch if it has records
         if batch:
             yield batch
+        if position is not None:
+            position["end"] = raw.tell()
 
-def _bulk_insert_batch(session, batch: List[Dict[str, Any]]):
+def _read_csv_checkpoint_chunks(csv_path: str, batch_size: int, start_offset: int = 0,
+                                position: Optional[Dict[str, int]] = None
+                                ) -> Iterator[Tuple[List[Dict[str, Any]], List[Tuple[int, str, str]], int]]:
+    """
+    Line by line reader for checkpointed loads (a record per line, as
+    for parallel parsing). Yields (rows, rejected, end) per batch of
+    `batch_size` lines: the valid rows, (offset, line, error) for the
+    lines that failed validation, and the byte offset after the batch.
+    """
+    with open(csv_path, 'rb') as raw:
+        fieldnames = next(csv.reader([raw.readline().decode('utf-8')]))
+        offset = max(start_offset, raw.tell())
+        raw.seek(offset)
+        rows, rejected = [], []
+        for line in raw:
+            line_offset = offset
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                values = next(csv.reader([line.decode('utf-8')]))
+                rows.append(_process_row(dict(zip(fieldnames, values))))
+            except (KeyError, ValueError, csv.Error) as e:
+                error = f"missing column {e}" if isinstance(e, KeyError) else str(e)
+                rejected.append((line_offset, line.decode('utf-8', 'replace').rstrip('\r\n'), error))
+            if len(rows) + len(rejected) >= batch_size:
+                yield rows, rejected, offset
+                rows, rejected = [], []
+        if rows or rejected:
+            yield rows, rejected, offset
+        if position is not None:
+            position["end"] = offset
+
+def _line_aligned_ranges(csv_path: str, start: int, end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Splits [start, end) into ranges of about `chunk_bytes` that begin at
+    line starts. Assumes no quoted field contains a newline.
+    """
+    boundaries = [start]
+    with open(csv_path, 'rb') as file:
+        offset = start + chunk_bytes
+        while offset < end:
+            # Move to the start of the line after the one holding `offset`
+            file.seek(offset - 1)
+            file.readline()
+            offset = file.tell()
+            if offset >= end:
+                break
+            boundaries.append(offset)
+            offset += chunk_bytes
+    boundaries.append(end)
+    return list(zip(boundaries, boundaries[1:]))
+
+def _parse_range(csv_path: str, fieldnames: List[str], start: int, end: int) -> List[Dict[str, Any]]:
+    """Parses the rows in one byte range (runs in a worker process)."""
+    with open(csv_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start).decode('utf-8')
+    reader = csv.DictReader(io.StringIO(data, newline=''), fieldnames=fieldnames)
+    return [_process_row(row) for row in reader]
+
+def _read_csv_chunks_parallel(csv_path: str, batch_size: int, workers: int, start_offset: int = 0,
+                              position: Optional[Dict[str, int]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Same batches as _read_csv_chunks, parsed by a pool of processes.
+    Only a few ranges are in flight at a time, so memory stays bounded
+    when the writer is slower than the parsers.
+    """
+    with open(csv_path, 'rb') as raw:
+        fieldnames = next(csv.reader([raw.readline().decode('utf-8')]))
+        start = max(start_offset, raw.tell())
+        end = raw.seek(0, os.SEEK_END)
+    ranges = iter(_line_aligned_ranges(csv_path, start, end, PARSE_CHUNK_BYTES))
+
+    batch = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(_parse_range, csv_path, fieldnames, *byte_range)
+            for _, byte_range in zip(range(workers * 2), ranges)
+        )
+        while pending:
+            rows = pending.popleft().result()
+            byte_range = next(ranges, None)
+            if byte_range is not None:
+                pending.append(executor.submit(_parse_range, csv_path, fieldnames, *byte_range))
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+    if position is not None:
+        position["end"] = end
+
+class AttributeConflictError(ValueError):
+    """Rows of a dimension value disagree on an attribute stored with it."""
+
+class _DimensionLookup:
+    """
+    In-memory map from a dimension's natural key to its surrogate id.
+    Unseen values are inserted once per batch, so the fact rows only
+    carry integer keys. `attributes` are columns stored along with a new
+    value, taken from the batch rows that carry it; every later row of
+    the value must agree with them (batch_attributes).
+    """
+
+    def __init__(self, session, table: str, key_column: str, attributes: Tuple[str, ...] = ()):
+        self.table = table
+        self.key_column = key_column
+        self.attributes = attributes
+        rows = session.execute(
+            text(f"SELECT {', '.join([key_column, 'id', *attributes])} FROM {table}")
+        ).all()
+        self.ids = {row[0]: row[1] for row in rows}
+        self.stored = {row[0]: tuple(row[2:]) for row in rows} if attributes else {}
+
+    def batch_attributes(self, keys: List[Any], columns: List[List[Any]]) -> Dict[Any, Tuple]:
+        """
+        Maps each key of a batch to its attributes, given the batch's
+        attribute columns. Raises AttributeConflictError when rows of a
+        key disagree with each other or with the values stored for it.
+        """
+        values = {}
+        for key, row in zip(keys, zip(*columns)):
+            known = values.setdefault(key, self.stored.get(key, row))
+            if row != known:
+                raise AttributeConflictError(
+                    f"{self.key_column} {key!r} has rows with different "
+                    f"{', '.join(self.attributes)}: {known} and {row}"
+                )
+        return values
+
+    def resolve(self, session, values: List[Any], attribute_values: Optional[Dict[Any, Tuple]] = None):
+        """
+        Inserts the values not seen yet and records their ids.
+        `attribute_values` maps each value to its `attributes`.
+        """
+        new_values = [value for value in dict.fromkeys(values) if value not in self.ids]
+        if not new_values:
+            return
+        columns = [self.key_column, *self.attributes]
+        rows = [(value, *attribute_values[value]) if self.attributes else (value,) for value in new_values]
+        if session.get_bind().dialect.name == "postgresql":
+            # One statement instead of one round trip per value
+            session.execute(
+                text(f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                     f"SELECT * FROM unnest({', '.join(f':c{i}' for i in range(len(columns)))})"),
+                {f"c{i}": list(column) for i, column in enumerate(zip(*rows))}
+            )
+        else:
+            session.execute(
+                text(f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(f':c{i}' for i in range(len(columns)))})"),
+                [{f"c{i}": value for i, value in enumerate(row)} for row in rows]
+            )
+        self.ids.update(session.execute(
+            text(f"SELECT {self.key_column}, id FROM {self.table} WHERE {self.key_column} IN :values")
+            .bindparams(bindparam("values", expanding=True)),
+            {"values": new_values}
+        ).all())
+        if self.attributes:
+            self.stored.update(zip(new_values, (row[1:] for row in rows)))
+
+# Per-ticket row values, stored on the ticket instead of every fact row
+TICKET_ATTRIBUTES = ("date", "week_day", "hour")
+
+def _load_dimensions(session) -> Dict[str, _DimensionLookup]:
+    """Builds the lookups keyed by the CSV column each one replaces."""
+    return {
+        'product_name': _DimensionLookup(session, "products", "name"),
+        'ticket_number': _DimensionLookup(session, "tickets", "ticket_number", TICKET_ATTRIBUTES),
+        'waiter': _DimensionLookup(session, "waiters", "code"),
+    }
+
+# CSV column -> fact column holding its dimension id
+DIMENSION_ID_COLUMNS = {
+    'product_name': 'product_id',
+    'ticket_number': 'ticket_id',
+    'waiter': 'waiter_id',
+}
+
+FACT_COLUMNS = [
+    "product_id", "ticket_id", "waiter_id", "quantity", "unitary_price", "total", "iso_date", "epoch_day", "year",
+    "month", "week_of_year", "minute_of_day", "fingerprint",
+]
+
+# Rows whose fingerprint is already stored are skipped
+_FACT_INSERT = (
+    f"INSERT OR IGNORE INTO sales_fact ({', '.join(FACT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in FACT_COLUMNS)})"
+)
+
+def _bulk_insert_batch(session, batch: List[Dict[str, Any]], dimensions: Dict[str, _DimensionLookup],
+                       raw: bool = False) -> int:
     """
     Inserts batch using bulk operations for maximum efficiency.
-    Much faster than inserting one by one.
+    Much faster than inserting one by one. PostgreSQL receives the
+    batch through COPY instead of INSERT statements; with `raw`, SQLite
+    receives tuples through the sqlite3 cursor. Rows must carry their
+    fingerprint (_RowFingerprints); returns the rows inserted, which
+    excludes the duplicates skipped.
     """
+    for column, lookup in dimensions.items():
+        keys = [row[column] for row in batch]
+        attribute_values = (
+            lookup.batch_attributes(keys, [[row[name] for row in batch] for name in lookup.attributes])
+            if lookup.attributes else None
+        )
+        lookup.resolve(session, keys, attribute_values)
+
+    for column, id_column in DIMENSION_ID_COLUMNS.items():
+        ids = dimensions[column].ids
+        for row in batch:
+            row[id_column] = ids[row[column]]
+
+    if session.get_bind().dialect.name == "postgresql":
+        return _copy_batch(session, batch)
+
+    if raw:
+        return _executemany(session, [tuple(row[column] for column in FACT_COLUMNS) for row in batch])
+
     # Use bulk insert for maximum performance
-    session.execute(
+    return session.execute(
         text("""
-            INSERT INTO sales (date, week_day, hour, ticket_number, waiter, 
-                             product_name, quantity, unitary_price, total)
-            VALUES (:date, :week_day, :hour, :ticket_number, :waiter,
-                   :product_name, :quantity, :unitary_price, :total)
+            INSERT OR IGNORE INTO sales_fact (product_id, ticket_id, waiter_id, quantity,
+                                              unitary_price, total,
+                                              iso_date, epoch_day, year, month, week_of_year,
+                                              minute_of_day, fingerprint)
+            VALUES (:product_id, :ticket_id, :waiter_id, :quantity,
+                   :unitary_price, :total,
+                   :iso_date, :epoch_day, :year, :month, :week_of_year,
+                   :minute_of_day, :fingerprint)
         """),
         batch
+    ).rowcount
+
+def _bulk_insert_table(session, table, dimensions: Dict[str, _DimensionLookup], raw: bool = False) -> int:
+    """
+    Arrow counterpart of _bulk_insert_batch: dimension ids are resolved
+    once per distinct value and spread over the column arrays, and the
+    rows go to the driver straight from those arrays.
+    """
+    for column, id_column in DIMENSION_ID_COLUMNS.items():
+        lookup = dimensions[column]
+        attribute_values = (
+            lookup.batch_attributes(table[column].to_pylist(),
+                                    [table[name].to_pylist() for name in lookup.attributes])
+            if lookup.attributes else None
+        )
+
+        def resolve(values, lookup=lookup, attribute_values=attribute_values):
+            lookup.resolve(session, values, attribute_values)
+            return lookup.ids
+
+        table = table.append_column(id_column, dimension_ids(table[column], resolve))
+    facts = table.select(FACT_COLUMNS)
+
+    if session.get_bind().dialect.name == "postgresql":
+        return _copy_rows(session, io.BytesIO(table_csv(facts)))
+
+    if raw:
+        return _executemany(session, table_rows(facts))
+    return session.connection().exec_driver_sql(_FACT_INSERT, table_rows(facts)).rowcount
+
+def _executemany(session, rows: List[Tuple]) -> int:
+    """
+    Inserts fact row tuples with the sqlite3 cursor's executemany,
+    skipping SQLAlchemy's per-row parameter handling.
+    """
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.executemany(_FACT_INSERT, rows)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+def _copy_batch(session, batch: List[Dict[str, Any]]) -> int:
+    """Streams the fact rows of a batch to PostgreSQL with COPY FROM STDIN."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([row[column] for column in FACT_COLUMNS] for row in batch)
+    buffer.seek(0)
+    return _copy_rows(session, buffer)
+
+def _copy_rows(session, buffer) -> int:
+    """
+    Sends a headerless CSV buffer of fact rows with COPY FROM STDIN to a
+    staging table, then moves the rows with a new fingerprint to
+    sales_fact (COPY itself cannot skip rows). Returns the rows inserted.
+    """
+    columns = ", ".join(FACT_COLUMNS)
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS sales_fact_staging AS "
+            f"SELECT {columns} FROM sales_fact WITH NO DATA"
+        )
+        cursor.copy_expert(f"COPY sales_fact_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO sales_fact ({columns}) SELECT {columns} FROM sales_fact_staging "
+            f"ON CONFLICT (fingerprint) DO NOTHING"
+        )
+        inserted = cursor.rowcount
+        cursor.execute("TRUNCATE sales_fact_staging")
+        return inserted
+    finally:
+        cursor.close()
+
+def drop_indexes(session):
+    """Drops the managed secondary indexes before a bulk load."""
+    for indexes in MANAGED_INDEXES.values():
+        for name in indexes:
+            session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def build_indexes(session):
+    """
+    Creates the managed secondary indexes and refreshes planner statistics.
+    Building once after the load is much cheaper than updating every
+    index on each insert.
+    """
+    for table, indexes in MANAGED_INDEXES.items():
+        for name, columns in indexes.items():
+            session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+            ))
+    session.execute(text("ANALYZE"))
+    session.commit()
+    logger.info(f"Built the indexes on {', '.join(MANAGED_INDEXES)} and analyzed")
+
+def _indexes_built(session) -> bool:
+    """Whether the managed indexes exist and sales_fact has planner statistics."""
+    bind = session.get_bind()
+    for table, indexes in MANAGED_INDEXES.items():
+        existing = {index["name"] for index in inspect(bind).get_indexes(table)}
+        if not set(indexes) <= existing:
+            return False
+    if bind.dialect.name == "postgresql":
+        statistics = "SELECT EXISTS (SELECT 1 FROM pg_stats WHERE tablename = 'sales_fact')"
+    elif inspect(bind).has_table("sqlite_stat1"):
+        statistics = "SELECT EXISTS (SELECT 1 FROM sqlite_stat1 WHERE tbl = 'sales_fact')"
+    else:
+        return False  # never analyzed
+    return bool(session.execute(text(statistics)).scalar())
+
+def materialize_tickets(session, after_id: Optional[int] = None):
+    """
+    Fills the per-ticket columns of `tickets` (typed date/time, waiter,
+    item count and basket total) from the fact table, so customer counts and
+    basket metrics read one row per ticket instead of COUNT(DISTINCT).
+    With `after_id`, only tickets with fact rows past that id are updated.
+    """
+    only_new = (
+        "WHERE f.ticket_id IN (SELECT ticket_id FROM sales_fact WHERE id > :after_id)"
+        if after_id is not None else ""
     )
+    session.execute(text(f"""
+        UPDATE tickets
+        SET iso_date = agg.iso_date, epoch_day = agg.epoch_day,
+            year = agg.year, month = agg.month, week_of_year = agg.week_of_year,
+            minute_of_day = agg.minute_of_day,
+            waiter = agg.waiter, line_count = agg.line_count,
+            item_count = agg.item_count, basket_total = agg.basket_total
+        FROM (
+            SELECT f.ticket_id, MIN(f.iso_date) AS iso_date,
+                   MIN(f.epoch_day) AS epoch_day, MIN(f.year) AS year,
+                   MIN(f.month) AS month, MIN(f.week_of_year) AS week_of_year,
+                   MIN(f.minute_of_day) AS minute_of_day, MIN(w.code) AS waiter,
+                   COUNT(*) AS line_count, SUM(f.quantity) AS item_count,
+                   SUM(f.total) AS basket_total
+            FROM sales_fact f
+            JOIN waiters w ON w.id = f.waiter_id
+            {only_new}
+            GROUP BY f.ticket_id
+        ) AS agg
+        WHERE tickets.id = agg.ticket_id
+    """), {"after_id": after_id} if after_id is not None else {})
+    session.commit()
+    logger.info("Materialized ticket-level metrics")
 
-def load_csv_to_db(csv_path: str):
+def clear_data(session):
+    """Deletes the loaded rows so the file can be loaded again."""
+    for table in ("sales_fact", "tickets", "products", "waiters", "ingested_files", "ingest_progress",
+                  "quarantined_rows"):
+        session.execute(text(f"DELETE FROM {table}"))
+    # A stale watermark would make the next delta skip the start of the file
+    session.execute(text("DELETE FROM ingest_meta WHERE key LIKE 'watermark%'"))
+    session.commit()
+
+def load_csv_to_db(csv_path: str, engine=None) -> str:
     """
     Main loading function with existing data verification.
     Uses streaming by default for scalability.
+    Skips loading when the database already holds this exact file
+    (same content hash), and only ingests the new tail when rows were
+    appended after the watermark. With CSV_CHECKPOINT_BATCHES, cold
+    loads from the CSV are checkpointed, and an interrupted one resumes.
+    Returns "skipped", "delta", "resumed", "snapshot" or "csv".
+    Directories, globs and compressed files are loaded with
+    load_csv_sources ("files", or "skipped").
     """
-    session = get_session()
+    if is_multi_source(csv_path):
+        return "files" if load_csv_sources(csv_path, engine=engine) else "skipped"
+
+    content_hash = csv_content_hash(csv_path)
+    session = get_session(engine)
     try:
         # Check if data already exists
-        existing_count = session.query(Sale).count()
+        existing_count = session.query(SaleFact).count()
         logger.info(f"Existing records in DB: {existing_count}")
-        
-        if existing_count == 0:
-            # Only load if no data exists
-            load_csv_streaming(csv_path)
-        else:
-            logger.info("Data already exists, skipping load")
-            
+
+        if existing_count and get_meta(session, "csv_sha256") == content_hash:
+            logger.info("Data already loaded from this file (hash match), skipping load")
+            # Databases loaded before the managed indexes/rollups existed
+            if not _indexes_built(session):
+                build_indexes(session)
+            existing_tables = inspect(session.get_bind()).get_table_names()
+            if any(rollup.name not in existing_tables for rollup in built_rollups()):
+                build_rollups(session)
+            if get_meta(session, "watermark_prefix_sha256") is None:
+                # Loaded before watermarks (or their prefix hash) were tracked
+                _set_watermark(session, csv_path, os.path.getsize(csv_path))
+                session.commit()
+            return "skipped"
+
+        if _checkpoint(session, content_hash):
+            session.close()
+            return load_csv_checkpointed(csv_path, content_hash=content_hash, engine=engine)
+
+        if existing_count:
+            start_offset = _valid_watermark(session, csv_path)
+            if start_offset is not None:
+                return load_csv_delta(csv_path, start_offset, content_hash=content_hash, engine=engine)
+            logger.info(f"{csv_path} changed before the watermark, reloading")
+            clear_data(session)
+        # The build may switch journal mode, which needs the file to itself
+        session.close()
+        if CSV_CHECKPOINT_BATCHES and not find_snapshot(csv_path, content_hash):
+            return load_csv_checkpointed(csv_path, content_hash=content_hash, engine=engine)
+        return load_csv_streaming(csv_path, content_hash=content_hash, engine=engine)
+
     finally:
         session.close()
@@ -0,0 +1,103 @@
+"""
+Startup coordination between server worker processes (gunicorn -w N
+runs the lifespan once per worker). An exclusive lock on a file makes
+one worker initialize the schema and load the CSV while the others wait
+for it, bounded by LOAD_WAIT_TIMEOUT. A waiting worker then checks the
+readiness flag (the loaded file's hash, recorded in ingest_meta as the
+last step of a successful load) and serves without touching the data;
+when it is not set (the loading worker failed) the waiting worker loads
+in its place.
+"""
+import os
+import time
+import fcntl
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import inspect, text
+
+from app.database import database_file, engine as default_engine, get_meta, get_session, init_db
+from app.utils.csv_loader import load_csv_to_db, pending_sources
+from app.utils.snapshot import csv_content_hash
+from app.utils.sources import is_multi_source
+
+logger = logging.getLogger(__name__)
+
+# Next to the SQLite file by default, so every worker using it agrees
+LOAD_LOCK_PATH = os.getenv("LOAD_LOCK_PATH") or f"{database_file() or './data'}.load.lock"
+LOAD_WAIT_TIMEOUT = float(os.getenv("LOAD_WAIT_TIMEOUT", "300"))
+LOCK_POLL_INTERVAL = 0.1
+
+def data_ready(csv_path: str, content_hash: Optional[str] = None, engine=None) -> bool:
+    """Whether the database holds a completed load of this exact file (or every file of a multi-file source)."""
+    engine = engine if engine is not None else default_engine
+    if not inspect(engine).has_table("ingest_meta"):
+        return False
+    session = get_session(engine)
+    try:
+        if not session.execute(text("SELECT EXISTS (SELECT 1 FROM sales_fact)")).scalar():
+            return False
+        if is_multi_source(csv_path):
+            return not pending_sources(session, csv_path)
+        return get_meta(session, "csv_sha256") == (content_hash or csv_content_hash(csv_path))
+    finally:
+        session.close()
+
+def coordinated_load(csv_path: str, engine=None, lock_path: str = LOAD_LOCK_PATH,
+                     timeout: float = LOAD_WAIT_TIMEOUT) -> str:
+    """
+    Initializes the database and loads `csv_path` (see load_csv_to_db)
+    in one process at a time. Returns the load's result, or "ready" in a
+    process that waited for another one to finish it.
+    """
+    engine = engine if engine is not None else default_engine
+    with open(lock_path, "a") as lock_file:
+        waited = not _try_lock(lock_file)
+        if waited:
+            logger.info(f"Another worker is loading the data, waiting up to {timeout:.0f}s")
+            _wait_for_lock(lock_file, timeout)
+        try:
+            if waited and data_ready(csv_path, engine=engine):
+                logger.info("Data loaded by another worker, ready")
+                return "ready"
+            init_db(engine)
+            return load_csv_to_db(csv_path, engine=engine)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+@contextmanager
+def load_lock(lock_path: str = LOAD_LOCK_PATH, timeout: float = LOAD_WAIT_TIMEOUT) -> Iterator[None]:
+    """Holds the load lock for the block, waiting up to `timeout` seconds for it."""
+    with open(lock_path, "a") as lock_file:
+        _wait_for_lock(lock_file, timeout)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+@contextmanager
+def try_load_lock(lock_path: str = LOAD_LOCK_PATH) -> Iterator[bool]:
+    """Holds the load lock for the block when it is free; yields whether it was taken."""
+    with open(lock_path, "a") as lock_file:
+        locked = _try_lock(lock_file)
+        try:
+            yield locked
+        finally:
+            if locked:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _try_lock(lock_file) -> bool:
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+def _wait_for_lock(lock_file, timeout: float):
+    """Polls for the lock so the wait can be bounded."""
+    deadline = time.monotonic() + timeout
+    while not _try_lock(lock_file):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Another worker kept the data load lock for more than {timeout:.0f}s")
+        time.sleep(LOCK_POLL_INTERVAL)
@@ -0,0 +1,145 @@
+"""
+Typed columnar snapshots of the source CSV.
+A snapshot is a Parquet file holding the parsed rows (including the
+derived date/time columns), named after the CSV's content hash so a
+stale snapshot is never read for a changed file. Loading from it skips
+CSV parsing and type conversion entirely.
+
+Build ahead of time (e.g. in the Docker image) with:
+    python -m app.utils.snapshot data.csv
+"""
+import os
+import sys
+import glob
+import hashlib
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CSV_SNAPSHOT_DIR = os.getenv("CSV_SNAPSHOT_DIR", "./snapshot")
+CSV_SNAPSHOT_ENABLED = os.getenv("CSV_SNAPSHOT_ENABLED", "true").lower() == "true"
+
+# Column name -> Arrow type of the rows produced by csv_loader._read_csv_chunks
+SNAPSHOT_COLUMNS = {
+    "date": "string",
+    "week_day": "string",
+    "hour": "string",
+    "ticket_number": "string",
+    "waiter": "int64",
+    "product_name": "string",
+    "quantity": "float64",
+    "unitary_price": "float64",
+    "total": "float64",
+    "minute_of_day": "int64",
+    "iso_date": "string",
+    "epoch_day": "int64",
+    "year": "int64",
+    "month": "int64",
+    "week_of_year": "int64",
+}
+
+def csv_content_hash(csv_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_enabled() -> bool:
+    return CSV_SNAPSHOT_ENABLED and PYARROW_AVAILABLE
+
+def snapshot_path(csv_path: str, content_hash: str, directory: str = CSV_SNAPSHOT_DIR) -> str:
+    """Snapshot file for one version of `csv_path`."""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(directory, f"{stem}.{content_hash[:16]}.parquet")
+
+def find_snapshot(csv_path: str, content_hash: str, directory: str = CSV_SNAPSHOT_DIR) -> Optional[str]:
+    """Path of the snapshot matching the hash, or None."""
+    if not snapshot_enabled():
+        return None
+    path = snapshot_path(csv_path, content_hash, directory)
+    return path if os.path.exists(path) else None
+
+def snapshot_schema():
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in SNAPSHOT_COLUMNS.items()])
+
+class SnapshotWriter:
+    """
+    Streams parsed batches into a snapshot while the CSV is loaded.
+    Writes to a temporary file and renames it on close, so readers never
+    see a partial snapshot.
+    """
+
+    def __init__(self, csv_path: str, content_hash: str, directory: str = CSV_SNAPSHOT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.csv_path = csv_path
+        self.directory = directory
+        self.path = snapshot_path(csv_path, content_hash, directory)
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._writer = pq.ParquetWriter(self._tmp_path, snapshot_schema())
+
+    def write(self, batch):
+        """Appends a batch of row dicts or an Arrow table of the same columns."""
+        if not isinstance(batch, pa.Table):
+            batch = pa.Table.from_pylist(batch, schema=snapshot_schema())
+        self._writer.write_table(batch)
+
+    def close(self):
+        """Publishes the snapshot and removes older ones for the same file."""
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        stem = os.path.splitext(os.path.basename(self.csv_path))[0]
+        for old in glob.glob(os.path.join(self.directory, f"{stem}.*.parquet")):
+            if old != self.path:
+                os.remove(old)
+        logger.info(f"Wrote CSV snapshot {self.path}")
+
+    def abort(self):
+        self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+def read_snapshot_chunks(path: str, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yields batches of row dicts, like csv_loader._read_csv_chunks."""
+    for record_batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield record_batch.to_pylist()
+
+def read_snapshot_tables(path: str, batch_size: int) -> Iterator["pa.Table"]:
+    """Yields Arrow tables, like arrow_ingest.read_csv_tables."""
+    for record_batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield pa.Table.from_batches([record_batch])
+
+def build_snapshot(csv_path: str, batch_size: int = 10000) -> str:
+    """Parses `csv_path` once and writes its snapshot; returns the path."""
+    from app.utils.csv_loader import _read_csv_chunks
+
+    content_hash = csv_content_hash(csv_path)
+    existing = find_snapshot(csv_path, content_hash)
+    if existing:
+        logger.info(f"Snapshot {existing} is up to date")
+        return existing
+
+    writer = SnapshotWriter(csv_path, content_hash)
+    try:
+        for batch in _read_csv_chunks(csv_path, batch_size):
+            writer.write(batch)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.path
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if not PYARROW_AVAILABLE:
+        sys.exit("pyarrow is required to build snapshots")
+    print(build_snapshot(sys.argv[1] if len(sys.argv) > 1 else "data.csv"))
@@ -0,0 +1,45 @@
+"""
+Source files for the loader. CSV_SOURCE is a single CSV file (the
+default, data.csv), a directory, or a glob of .csv, .csv.gz and .csv.zst
+files such as daily POS exports. Compressed files are decompressed as a
+stream, never to a temporary file.
+"""
+import io
+import os
+import glob
+import gzip
+from typing import BinaryIO, List
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    ZSTD_AVAILABLE = False
+
+CSV_SOURCE = os.getenv("CSV_SOURCE", "data.csv")
+SOURCE_SUFFIXES = (".csv", ".csv.gz", ".csv.zst")
+
+def is_multi_source(source: str) -> bool:
+    """
+    Whether `source` is loaded file by file (load_csv_sources) rather
+    than as one plain CSV with a snapshot and watermark.
+    """
+    return os.path.isdir(source) or any(char in source for char in "*?[") or source.endswith((".gz", ".zst"))
+
+def expand_sources(source: str) -> List[str]:
+    """The source files of a directory, glob or single path, sorted."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source)
+    return sorted(path for path in paths if path.endswith(SOURCE_SUFFIXES) and os.path.isfile(path))
+
+def open_source(path: str) -> BinaryIO:
+    """Opens a source file for reading its (decompressed) CSV bytes."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"Reading {path} requires the zstandard package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
@@ -0,0 +1,69 @@
+"""
+Backend benchmark: SQLite (sales view, no rollups) against DuckDB over the
+Parquet snapshot, on a corpus of typical questions at several data scales.
+Scaled databases replicate the fact rows N times.
+
+    python -m benchmarks.bench_backends [scale ...]   # default: 1 10 100
+"""
+import os
+import sys
+import tempfile
+from sqlalchemy import text
+
+from app.backends.duckdb_backend import DuckDBBackend, export_parquet_snapshot
+from app.database import create_db_engine
+from benchmarks.common import copy_database, ensure_loaded, time_call, print_table
+
+CORPUS = {
+    "revenue": "SELECT SUM(total) FROM sales",
+    "top_products": "SELECT product_name, SUM(quantity) AS total_sold FROM sales GROUP BY product_name ORDER BY total_sold DESC LIMIT 5",
+    "customers": "SELECT COUNT(DISTINCT ticket_number) FROM sales",
+    "by_weekday_hour": "SELECT week_day, substr(hour, 1, 2) AS h, SUM(total) FROM sales GROUP BY week_day, h",
+    "monthly_products": "SELECT month, product_name, SUM(total) FROM sales WHERE year = 2024 GROUP BY month, product_name",
+    "avg_ticket": "SELECT AVG(t) FROM (SELECT ticket_number, SUM(total) AS t FROM sales GROUP BY ticket_number)",
+}
+
+FACT_COLUMNS = """product_id, ticket_id, waiter_id, quantity, unitary_price, total,
+    iso_date, epoch_day, year, month, week_of_year, minute_of_day"""
+
+def _scale(db_path: str, factor: int):
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    with engine.begin() as conn:
+        max_id = conn.execute(text("SELECT MAX(id) FROM sales_fact")).scalar()
+        for _ in range(factor - 1):
+            conn.execute(text(
+                f"INSERT INTO sales_fact ({FACT_COLUMNS}) "
+                f"SELECT {FACT_COLUMNS} FROM sales_fact WHERE id <= :max_id"
+            ), {"max_id": max_id})
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    ensure_loaded()
+
+    rows = []
+    for factor in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "scaled.db")
+            copy_database("data.db", db_path)
+            _scale(db_path, factor)
+
+            sqlite_engine = create_db_engine(f"sqlite:///{db_path}", read_only=True)
+            export_parquet_snapshot(sqlite_engine, os.path.join(tmp, "snapshot"))
+            duck = DuckDBBackend(os.path.join(tmp, "snapshot"))
+            duck.load()
+
+            with sqlite_engine.connect() as conn:
+                for name, sql in CORPUS.items():
+                    sqlite_ms = time_call(lambda: conn.execute(text(sql)).fetchall(), repeat=3) * 1000
+                    duck_ms = time_call(lambda: duck.execute(sql), repeat=3) * 1000
+                    rows.append([f"{factor}x", name, f"{sqlite_ms:.1f}", f"{duck_ms:.1f}",
+                                 f"{sqlite_ms / duck_ms:.1f}x"])
+            duck.close()
+            sqlite_engine.dispose()
+
+    print_table("Median query time (ms)", ["scale", "query", "sqlite", "duckdb", "speedup"], rows)
+
+if __name__ == "__main__":
+    main()
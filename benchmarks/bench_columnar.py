@@ -0,0 +1,37 @@
+"""
+Columnar engine benchmark: recognized aggregate shapes on the NumPy store
+against the same SQL on SQLite (sales view).
+"""
+from sqlalchemy import text
+
+from app.columnar import ColumnarStore
+from app.database import read_engine
+from benchmarks.common import ensure_loaded, time_call, print_table
+
+QUERIES = {
+    "revenue": "SELECT SUM(total) FROM sales",
+    "top_products": "SELECT product_name, SUM(quantity) AS total_sold FROM sales GROUP BY product_name ORDER BY total_sold DESC LIMIT 5",
+    "by_weekday": "SELECT week_day, SUM(total), COUNT(*) FROM sales GROUP BY week_day",
+    "by_hour": "SELECT hour, SUM(total) FROM sales GROUP BY hour",
+    "customers": "SELECT COUNT(DISTINCT ticket_number) FROM sales",
+    "customers_by_day": "SELECT iso_date, COUNT(DISTINCT ticket_number) FROM sales GROUP BY iso_date",
+    "filtered_products": "SELECT product_name, AVG(total) FROM sales WHERE iso_date >= '2024-11-01' AND week_day = 'Saturday' GROUP BY product_name",
+}
+
+def main():
+    ensure_loaded()
+    store = ColumnarStore.load(read_engine)
+
+    rows = []
+    with read_engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            assert store.execute(sql) is not None, f"{name} not recognized"
+            sqlite = time_call(lambda: conn.execute(text(sql)).fetchall()) * 1000
+            columnar = time_call(lambda: store.execute(sql)) * 1000
+            rows.append([name, f"{sqlite:.2f}", f"{columnar:.2f}", f"{sqlite / columnar:.1f}x"])
+
+    print_table(f"Median query time (ms), {store.row_count} rows",
+                ["query", "sqlite", "columnar", "speedup"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Deduplication benchmark on a scaled copy of data.csv, for both ingest
+engines:
+- parse throughput with and without computing the row fingerprints;
+- cold load rows/sec with sales_fact's unique fingerprint index, and
+  with the index dropped (inserts without duplicate checks);
+- re-load of the same rows as an overlapping export, all skipped.
+
+    python -m benchmarks.bench_dedup [scale]   # default: 10
+"""
+import os
+import sys
+import time
+import tempfile
+
+# The synthetic file must not replace the data.csv snapshot
+os.environ.setdefault("CSV_SNAPSHOT_ENABLED", "false")
+
+from sqlalchemy import text
+
+from app.database import create_db_engine, init_db
+from app.utils.arrow_ingest import PYARROW_AVAILABLE
+from app.utils.csv_loader import _RowFingerprints, _csv_chunks, load_csv_sources, load_csv_streaming
+from benchmarks.common import print_table, scaled_csv
+
+FINGERPRINT_INDEX = "ix_sales_fact_fingerprint"
+
+def _parse_seconds(csv_path: str, ingest: str, fingerprint: bool) -> float:
+    fingerprints = _RowFingerprints()
+    start = time.perf_counter()
+    for batch in _csv_chunks(csv_path, 1000, workers=1, ingest=ingest):
+        if fingerprint:
+            fingerprints.add(batch)
+    return time.perf_counter() - start
+
+def _load_seconds(db_path: str, csv_path: str, ingest: str, unique_index: bool) -> float:
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    init_db(engine)
+    if not unique_index:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX {FINGERPRINT_INDEX}"))
+    start = time.perf_counter()
+    load_csv_streaming(csv_path, engine=engine, ingest=ingest, workers=1)
+    seconds = time.perf_counter() - start
+    engine.dispose()
+    return seconds
+
+def _reload_seconds(db_path: str, source: str, ingest: str, row_count: int) -> float:
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    start = time.perf_counter()
+    stats = load_csv_sources(source, engine=engine, ingest=ingest, workers=1)
+    seconds = time.perf_counter() - start
+    engine.dispose()
+    assert stats[0]["skipped"] == row_count, stats
+    return seconds
+
+def main():
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    engines = ["python", "arrow"] if PYARROW_AVAILABLE else ["python"]
+    parse_rows = []
+    load_rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "scaled.csv")
+        row_count = scaled_csv(csv_path, factor)
+        # Same rows, different bytes: not recognized as an ingested file
+        export_dir = os.path.join(tmp, "exports")
+        os.makedirs(export_dir)
+        with open(csv_path, "rb") as source, open(os.path.join(export_dir, "overlap.csv"), "wb") as target:
+            target.write(source.read() + b"\n")
+
+        for ingest in engines:
+            plain = _parse_seconds(csv_path, ingest, fingerprint=False)
+            hashed = _parse_seconds(csv_path, ingest, fingerprint=True)
+            parse_rows.append([ingest, f"{row_count / plain:,.0f}", f"{row_count / hashed:,.0f}",
+                               f"{(hashed - plain) / plain:+.0%}"])
+
+            without_index = _load_seconds(os.path.join(tmp, f"{ingest}_plain.db"), csv_path, ingest, False)
+            db_path = os.path.join(tmp, f"{ingest}_dedup.db")
+            with_index = _load_seconds(db_path, csv_path, ingest, True)
+            reload = _reload_seconds(db_path, export_dir, ingest, row_count)
+            load_rows.append([ingest, f"{row_count / without_index:,.0f}", f"{row_count / with_index:,.0f}",
+                              f"{(with_index - without_index) / without_index:+.0%}",
+                              f"{row_count / reload:,.0f}"])
+
+    print_table(f"Parse of {row_count} rows (rows/s)",
+                ["engine", "parse", "parse+fingerprint", "overhead"], parse_rows)
+    print_table(f"Cold load of {row_count} rows (rows/s)",
+                ["engine", "no_unique_index", "unique_index", "overhead", "reload_all_skipped"], load_rows)
+
+if __name__ == "__main__":
+    main()
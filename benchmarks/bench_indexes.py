@@ -0,0 +1,53 @@
+"""
+Index benchmark: README/prompt example queries against a copy of the
+database without the managed indexes and a copy with them.
+"""
+import os
+import tempfile
+from sqlalchemy import text
+
+from app.database import create_db_engine
+from app.utils.csv_loader import build_indexes, drop_indexes
+from benchmarks.common import copy_database, ensure_loaded, time_call, print_table
+
+QUERIES = {
+    "top_products": "SELECT product_name, SUM(quantity) as total_sold FROM sales GROUP BY product_name ORDER BY total_sold DESC LIMIT 5",
+    "count_rows": "SELECT COUNT(*) FROM sales",
+    "customers": "SELECT COUNT(DISTINCT ticket_number) as total_clientes FROM sales",
+    "revenue": "SELECT SUM(total) as total_ventas FROM sales",
+    "one_day": "SELECT SUM(total) FROM sales WHERE date = '11/13/2024'",
+    "weekday_hour": "SELECT week_day, hour, SUM(total) FROM sales GROUP BY week_day, hour",
+}
+
+def _timings(db_path: str, indexed: bool):
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        (build_indexes if indexed else drop_indexes)(conn)
+        conn.commit()
+
+    timings = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            timings[name] = time_call(lambda: conn.execute(text(sql)).fetchall()) * 1000
+    engine.dispose()
+    return timings
+
+def main():
+    ensure_loaded()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, "plain.db")
+        indexed_path = os.path.join(tmp, "indexed.db")
+        copy_database("data.db", plain_path)
+        copy_database("data.db", indexed_path)
+        plain = _timings(plain_path, indexed=False)
+        indexed = _timings(indexed_path, indexed=True)
+
+    rows = [
+        [name, f"{plain[name]:.2f}", f"{indexed[name]:.2f}", f"{plain[name] / indexed[name]:.1f}x"]
+        for name in QUERIES
+    ]
+    print_table("Median query time (ms)", ["query", "no_index", "indexed", "speedup"], rows)
+
+if __name__ == "__main__":
+    main()
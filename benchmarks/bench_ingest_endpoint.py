@@ -0,0 +1,126 @@
+"""
+POST /ingest benchmark: starts the API with uvicorn on a fresh SQLite
+file loaded from data.csv, then streams data.csv's rows `scale` times
+as a chunked CSV body and as NDJSON (each copy on tickets of its own),
+and checks that the row counts and data version moved. Then sends the
+CSV upload again, which must be skipped as duplicates. Prints the
+server-side and client-side throughput.
+
+    python -m benchmarks.bench_ingest_endpoint [scale]   # default: 2
+"""
+import os
+import sys
+import csv
+import json
+import time
+import socket
+import tempfile
+import subprocess
+from typing import Iterator
+
+import httpx
+
+from benchmarks.common import print_table
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _copies(rows, header, scale: int, tag: str) -> Iterator[list]:
+    """The rows `scale` times, with ticket numbers unique to each copy."""
+    ticket = header.index("ticket_number")
+    for copy in range(scale):
+        for row in rows:
+            row = list(row)
+            row[ticket] = f"{row[ticket]}-{tag}{copy}"
+            yield row
+
+def _csv_body(rows, header, scale: int, tag: str) -> Iterator[bytes]:
+    yield (",".join(header) + "\n").encode()
+    lines = []
+    for row in _copies(rows, header, scale, tag):
+        lines.append(",".join(row))
+        if len(lines) == 1000:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+def _ndjson_body(rows, header, scale: int, tag: str) -> Iterator[bytes]:
+    lines = []
+    for row in _copies(rows, header, scale, tag):
+        lines.append(json.dumps(dict(zip(header, row))))
+        if len(lines) == 1000:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+def _sales_rows(client: httpx.Client) -> int:
+    response = client.post("/query", json={"sql": "SELECT COUNT(*) AS n FROM sales"})
+    response.raise_for_status()
+    return response.json()["data"]["rows"][0][0]
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    with open("data.csv", newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        rows = list(reader)
+    expected = len(rows) * scale
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port = _free_port()
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'ingest.db')}",
+            CSV_SNAPSHOT_ENABLED="false",
+            OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "unused"),
+            PYTHONPATH=os.getcwd(),
+        )
+        env.pop("LOAD_LOCK_PATH", None)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            results = []
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+                for _ in range(600):
+                    try:
+                        if client.get("/health").status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.5)
+                before = _sales_rows(client)
+
+                uploads = [("csv", _csv_body, "text/csv", "c"),
+                           ("ndjson", _ndjson_body, "application/x-ndjson", "n"),
+                           ("csv (again)", _csv_body, "text/csv", "c")]
+                for name, body, content_type, tag in uploads:
+                    start = time.perf_counter()
+                    response = client.post("/ingest", content=body(rows, header, scale, tag),
+                                           headers={"content-type": content_type})
+                    seconds = time.perf_counter() - start
+                    response.raise_for_status()
+                    result = response.json()
+                    assert result["rows"] == expected, result
+                    results.append([name, result["rows"], result["skipped"], result["seconds"],
+                                    f"{result['rows_per_s']:,}", f"{seconds:.2f}",
+                                    f"{expected / seconds:,.0f}", result["data_version"] or "-"])
+                assert results[-1][2] == expected, "repeated upload was not skipped"
+
+                after = _sales_rows(client)
+                assert after == before + 2 * expected, (before, after)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_table(f"POST /ingest, {expected} rows per upload",
+                ["upload", "rows", "skipped", "server_s", "insert_rows_per_s", "client_s", "client_rows_per_s",
+                 "data_version"], results)
+
+if __name__ == "__main__":
+    main()
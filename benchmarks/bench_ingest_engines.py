@@ -0,0 +1,53 @@
+"""
+Ingest engine benchmark: rows/sec of the python (csv module, row dicts)
+and arrow (typed column chunks) engines on a scaled copy of data.csv,
+parse-only and for a full load into a fresh SQLite file, at a few
+CSV_BATCH_SIZE values.
+
+    python -m benchmarks.bench_ingest_engines [scale]   # default: 20
+"""
+import os
+import sys
+import time
+import tempfile
+
+# The synthetic file must not replace the data.csv snapshot
+os.environ.setdefault("CSV_SNAPSHOT_ENABLED", "false")
+
+from app.database import create_db_engine, init_db
+from app.utils.csv_loader import _csv_chunks, load_csv_streaming
+from benchmarks.common import print_table, scaled_csv
+
+ENGINES = ["python", "arrow"]
+BATCH_SIZES = [1000, 10000]
+
+def main():
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "scaled.csv")
+        row_count = scaled_csv(csv_path, factor)
+        size_mb = os.path.getsize(csv_path) / 1024 / 1024
+
+        for batch_size in BATCH_SIZES:
+            for ingest in ENGINES:
+                start = time.perf_counter()
+                parsed = sum(len(batch) for batch in _csv_chunks(csv_path, batch_size, ingest=ingest))
+                parse_seconds = time.perf_counter() - start
+                assert parsed == row_count
+
+                engine = create_db_engine(f"sqlite:///{os.path.join(tmp, f'{ingest}_{batch_size}.db')}")
+                init_db(engine)
+                start = time.perf_counter()
+                load_csv_streaming(csv_path, batch_size, engine=engine, ingest=ingest)
+                load_seconds = time.perf_counter() - start
+                engine.dispose()
+
+                rows.append([ingest, batch_size, f"{row_count / parse_seconds:,.0f}",
+                             f"{load_seconds:.2f}", f"{row_count / load_seconds:,.0f}"])
+
+    print_table(f"{row_count} rows, {size_mb:.0f} MB",
+                ["engine", "batch_size", "parse_rows_per_s", "load_s", "load_rows_per_s"], rows)
+
+if __name__ == "__main__":
+    main()
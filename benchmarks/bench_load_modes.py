@@ -0,0 +1,44 @@
+"""
+Load mode benchmark: rows/sec of a cold load into a fresh SQLite file
+(read_heavy profile, i.e. WAL) for each CSV_LOAD_MODE — SQLAlchemy dicts
+("safe"), sqlite3 executemany of tuples ("dbapi") and the same with
+journal/sync off during the build ("bulk") — with both ingest engines,
+on a scaled copy of data.csv.
+
+    python -m benchmarks.bench_load_modes [scale]   # default: 20
+"""
+import os
+import sys
+import time
+import tempfile
+
+# The synthetic file must not replace the data.csv snapshot
+os.environ.setdefault("CSV_SNAPSHOT_ENABLED", "false")
+
+from app.database import create_db_engine, init_db
+from app.utils.arrow_ingest import PYARROW_AVAILABLE
+from app.utils.csv_loader import LOAD_MODES, load_csv_streaming
+from benchmarks.common import print_table, scaled_csv
+
+def main():
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    engines = ["python", "arrow"] if PYARROW_AVAILABLE else ["python"]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "scaled.csv")
+        row_count = scaled_csv(csv_path, factor)
+
+        for ingest in engines:
+            for load_mode in LOAD_MODES:
+                engine = create_db_engine(f"sqlite:///{os.path.join(tmp, f'{ingest}_{load_mode}.db')}")
+                init_db(engine)
+                start = time.perf_counter()
+                load_csv_streaming(csv_path, engine=engine, ingest=ingest, load_mode=load_mode)
+                seconds = time.perf_counter() - start
+                engine.dispose()
+                rows.append([ingest, load_mode, f"{seconds:.2f}", f"{row_count / seconds:,.0f}"])
+
+    print_table(f"Cold load of {row_count} rows", ["engine", "load_mode", "seconds", "rows_per_s"], rows)
+
+if __name__ == "__main__":
+    main()
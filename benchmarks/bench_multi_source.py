@@ -0,0 +1,78 @@
+"""
+Multi-file source benchmark: splits a scaled copy of data.csv into
+daily-export-like files (plain, gzip and zstd in turn), then loads the
+directory into a fresh SQLite file with 1 and CSV_SOURCE_WORKERS parser
+threads. Prints per-file throughput and the total load time.
+
+    python -m benchmarks.bench_multi_source [scale] [files]   # default: 10 12
+"""
+import io
+import os
+import sys
+import csv
+import gzip
+import time
+import tempfile
+
+os.environ.setdefault("CSV_SNAPSHOT_ENABLED", "false")
+
+from app.database import create_db_engine, init_db
+from app.utils.csv_loader import CSV_SOURCE_WORKERS, load_csv_sources
+from app.utils.sources import ZSTD_AVAILABLE
+from benchmarks.common import print_table
+
+if ZSTD_AVAILABLE:
+    import zstandard
+
+def _write_sources(directory: str, scale: int, files: int) -> int:
+    """Writes `files` source files holding data.csv's rows `scale` times."""
+    with open("data.csv", newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        rows = list(reader)
+    rows = rows * scale
+    per_file = -(-len(rows) // files)
+    formats = [".csv", ".csv.gz", ".csv.zst"] if ZSTD_AVAILABLE else [".csv", ".csv.gz"]
+    for index in range(files):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows[index * per_file:(index + 1) * per_file])
+        data = buffer.getvalue().encode()
+        suffix = formats[index % len(formats)]
+        if suffix == ".csv.gz":
+            data = gzip.compress(data)
+        elif suffix == ".csv.zst":
+            data = zstandard.ZstdCompressor().compress(data)
+        with open(os.path.join(directory, f"sales_{index:03d}{suffix}"), "wb") as target:
+            target.write(data)
+    return len(rows)
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    totals = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "exports")
+        os.makedirs(source)
+        row_count = _write_sources(source, scale, files)
+
+        for workers in sorted({1, CSV_SOURCE_WORKERS}):
+            engine = create_db_engine(f"sqlite:///{os.path.join(tmp, f'load_{workers}.db')}")
+            init_db(engine)
+            start = time.perf_counter()
+            stats = load_csv_sources(source, engine=engine, workers=workers)
+            seconds = time.perf_counter() - start
+            engine.dispose()
+
+            totals.append([workers, f"{seconds:.2f}", f"{row_count / seconds:,.0f}"])
+            print_table(f"Per file, {workers} parser threads",
+                        ["file", "rows", "kb", "seconds", "rows_per_s"],
+                        [[os.path.basename(item["path"]), item["rows"], f"{item['bytes'] / 1024:.0f}",
+                          f"{item['seconds']:.2f}", f"{item['rows_per_s']:,.0f}"] for item in stats])
+
+    print_table(f"Load of {files} files, {row_count} rows ({os.cpu_count()} CPUs)",
+                ["workers", "seconds", "rows_per_s"], totals)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Parallel parsing benchmark: parse-only throughput and full load time of
+a synthetically scaled copy of data.csv (rows repeated N times) with 1,
+2, 4 and 8 parser processes feeding the single writer.
+
+    python -m benchmarks.bench_parallel_parse [scale]   # default: 20
+"""
+import os
+import sys
+import time
+import tempfile
+
+# The synthetic file must not replace the data.csv snapshot
+os.environ.setdefault("CSV_SNAPSHOT_ENABLED", "false")
+
+from app.database import create_db_engine, init_db
+from app.utils.csv_loader import _csv_chunks, load_csv_streaming
+from benchmarks.common import print_table, scaled_csv
+
+WORKERS = [1, 2, 4, 8]
+
+def main():
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "scaled.csv")
+        row_count = scaled_csv(csv_path, factor)
+        size_mb = os.path.getsize(csv_path) / 1024 / 1024
+
+        for workers in WORKERS:
+            start = time.perf_counter()
+            parsed = sum(len(batch) for batch in _csv_chunks(csv_path, 1000, workers=workers))
+            parse_seconds = time.perf_counter() - start
+            assert parsed == row_count
+
+            engine = create_db_engine(f"sqlite:///{os.path.join(tmp, f'load_{workers}.db')}")
+            init_db(engine)
+            start = time.perf_counter()
+            load_csv_streaming(csv_path, engine=engine, workers=workers)
+            load_seconds = time.perf_counter() - start
+            engine.dispose()
+
+            rows.append([workers, f"{parse_seconds:.2f}", f"{row_count / parse_seconds:,.0f}",
+                         f"{load_seconds:.2f}"])
+
+    print_table(f"{row_count} rows, {size_mb:.0f} MB ({os.cpu_count()} CPUs)",
+                ["workers", "parse_s", "parse_rows_per_s", "load_s"], rows)
+
+if __name__ == "__main__":
+    main()
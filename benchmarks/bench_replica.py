@@ -0,0 +1,83 @@
+"""
+Read replica benchmark: p50/p99 latency of concurrent /query calls
+against a 4-worker uvicorn server reading the shared data.db file, and
+with MEMORY_REPLICA (a private in-memory copy per worker).
+Every request uses distinct SQL so the result cache never answers it,
+and the columnar engine is disabled so queries reach SQLite.
+
+    python -m benchmarks.bench_replica
+"""
+import os
+import sys
+import time
+import itertools
+import subprocess
+
+import httpx
+
+from benchmarks.common import ensure_loaded, run_concurrent, print_table
+
+PORT = 8765
+WORKERS = 4
+CONCURRENCY = [4, 16, 64]
+QUERIES_PER_LEVEL = 400
+
+TEMPLATES = [
+    "SELECT product_name, SUM(total) FROM sales WHERE quantity < {n} GROUP BY product_name",
+    "SELECT waiter, COUNT(*) FROM sales WHERE total < {n} GROUP BY waiter",
+    "SELECT iso_date, SUM(quantity) FROM sales WHERE unitary_price < {n} GROUP BY iso_date",
+]
+
+def _start_server(memory_replica: bool) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        MEMORY_REPLICA=str(memory_replica).lower(),
+        COLUMNAR_ENGINE="false",
+        QUERY_BACKEND="sql",
+    )
+    env.setdefault("OPENAI_API_KEY", "unused")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--workers", str(WORKERS),
+         "--port", str(PORT), "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{PORT}/health").status_code == 200:
+                time.sleep(2)  # let every worker finish its lifespan
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("Server did not start")
+
+def main():
+    ensure_loaded()
+
+    counter = itertools.count(1_000_000)
+    rows = []
+    for memory_replica in (False, True):
+        server = _start_server(memory_replica)
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{PORT}", timeout=60,
+                              limits=httpx.Limits(max_connections=max(CONCURRENCY))) as client:
+                def query():
+                    n = next(counter)
+                    sql = TEMPLATES[n % len(TEMPLATES)].format(n=n)
+                    client.post("/query", json={"sql": sql}).raise_for_status()
+
+                for concurrency in CONCURRENCY:
+                    result = run_concurrent(query, concurrency, QUERIES_PER_LEVEL)
+                    rows.append(["memory" if memory_replica else "file", concurrency,
+                                 f"{result['qps']:.1f}", f"{result['p50_ms']:.1f}",
+                                 f"{result['p99_ms']:.1f}"])
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_table(f"/query latency, {WORKERS} workers", ["reads", "concurrency", "qps", "p50_ms", "p99_ms"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Rollup benchmark: typical aggregate questions run against `sales` and
+against the rollup chosen by rewrite_query. Exits non-zero when a
+rewritten query returns a different result.
+"""
+import sys
+
+from sqlalchemy import text
+
+from app.database import read_engine
+from app.services.rollups import rewrite_query
+from benchmarks.common import ensure_loaded, time_call, print_table
+
+QUERIES = {
+    "revenue": "SELECT SUM(total) as total_ventas FROM sales",
+    "top_products": "SELECT product_name, SUM(quantity) as total_sold FROM sales GROUP BY product_name ORDER BY total_sold DESC LIMIT 5",
+    "by_day": "SELECT iso_date, SUM(total) FROM sales GROUP BY iso_date ORDER BY iso_date",
+    "by_weekday": "SELECT week_day, SUM(total) FROM sales GROUP BY week_day",
+    "by_hour": "SELECT substr(hour, 1, 2) AS h, SUM(total) FROM sales GROUP BY h ORDER BY h",
+    "customers_per_day": "SELECT iso_date, COUNT(DISTINCT ticket_number) FROM sales GROUP BY iso_date",
+    "october_products": "SELECT product_name, SUM(total) FROM sales WHERE iso_date BETWEEN '2024-10-01' AND '2024-10-31' GROUP BY product_name",
+    # Filters matching no rows: counts must stay 0, not NULL
+    "empty_count": "SELECT COUNT(*) FROM sales WHERE hour LIKE '0%'",
+    "empty_customers": "SELECT COUNT(DISTINCT ticket_number) FROM sales WHERE iso_date = '1999-01-01'",
+    "empty_ticket_count": "SELECT COUNT(*), SUM(total) FROM sales WHERE ticket_number = 'none'",
+}
+
+def _normalized(rows):
+    """Rows in a comparable form (order-insensitive, floats rounded)."""
+    return sorted(
+        (tuple(round(value, 6) if isinstance(value, float) else value for value in row) for row in rows),
+        key=repr
+    )
+
+def main():
+    ensure_loaded()
+
+    rows = []
+    mismatches = []
+    with read_engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            rewritten, rollup = rewrite_query(sql)
+            if _normalized(conn.execute(text(sql)).fetchall()) != _normalized(conn.execute(text(rewritten)).fetchall()):
+                mismatches.append(name)
+            base = time_call(lambda: conn.execute(text(sql)).fetchall()) * 1000
+            fast = time_call(lambda: conn.execute(text(rewritten)).fetchall()) * 1000
+            rows.append([name, rollup or "-", f"{base:.2f}", f"{fast:.2f}", f"{base / fast:.1f}x"])
+
+    print_table("Median query time (ms)", ["query", "served_by", "sales", "rewritten", "speedup"], rows)
+    if mismatches:
+        sys.exit(f"FAIL: rewritten results differ from sales for {', '.join(mismatches)}")
+
+if __name__ == "__main__":
+    main()
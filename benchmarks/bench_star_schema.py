@@ -0,0 +1,78 @@
+"""
+Star schema benchmark: database size and aggregate latency of the
+normalized layout (sales_fact + dimensions behind the `sales` view)
+against the original flat `sales` table with equivalent indexes.
+"""
+import os
+import tempfile
+from sqlalchemy import text
+
+from app.database import create_db_engine
+from benchmarks.common import copy_database, ensure_loaded, time_call, print_table
+
+QUERIES = {
+    "revenue": "SELECT SUM(total) FROM sales",
+    "by_product": "SELECT product_name, SUM(total) FROM sales GROUP BY product_name",
+    "top_products": "SELECT product_name, SUM(quantity) as total_sold FROM sales GROUP BY product_name ORDER BY total_sold DESC LIMIT 5",
+    "customers": "SELECT COUNT(DISTINCT ticket_number) FROM sales",
+    "by_waiter": "SELECT waiter, SUM(total) FROM sales GROUP BY waiter",
+    "one_ticket": "SELECT * FROM sales WHERE ticket_number = 'FCB 0003-000024735'",
+}
+
+FLAT_INDEXES = {
+    "ix_flat_product_quantity_total": ["product_name", "quantity", "total"],
+    "ix_flat_ticket_number": ["ticket_number"],
+    "ix_flat_waiter": ["waiter"],
+    "ix_flat_date": ["date"],
+    "ix_flat_week_day_hour": ["week_day", "hour"],
+    "ix_flat_iso_date": ["iso_date"],
+    "ix_flat_epoch_day": ["epoch_day"],
+    "ix_flat_year_month": ["year", "month"],
+    "ix_flat_minute_of_day": ["minute_of_day"],
+}
+
+def _flatten(engine):
+    """Rewrites a star-schema copy into the original single-table layout."""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sales_flat AS SELECT * FROM sales"))
+        conn.execute(text("DROP VIEW sales"))
+        for table in ["sales_fact", "products", "tickets", "waiters"]:
+            conn.execute(text(f"DROP TABLE {table}"))
+        conn.execute(text("ALTER TABLE sales_flat RENAME TO sales"))
+        for name, columns in FLAT_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX {name} ON sales ({', '.join(columns)})"))
+        conn.execute(text("ANALYZE"))
+
+def _measure(db_path: str):
+    engine = create_db_engine(f"sqlite:///{db_path}", profile="default")
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+        timings = {
+            name: time_call(lambda: conn.execute(text(sql)).fetchall()) * 1000
+            for name, sql in QUERIES.items()
+        }
+    engine.dispose()
+    return os.path.getsize(db_path), timings
+
+def main():
+    ensure_loaded()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        star_path = os.path.join(tmp, "star.db")
+        flat_path = os.path.join(tmp, "flat.db")
+        copy_database("data.db", star_path)
+        copy_database("data.db", flat_path)
+
+        flat_engine = create_db_engine(f"sqlite:///{flat_path}", profile="default")
+        _flatten(flat_engine)
+        flat_engine.dispose()
+
+        flat_size, flat = _measure(flat_path)
+        star_size, star = _measure(star_path)
+
+    print(f"\nDatabase size: flat {flat_size / 1024:.0f} KiB, star {star_size / 1024:.0f} KiB")
+    rows = [[name, f"{flat[name]:.2f}", f"{star[name]:.2f}"] for name in QUERIES]
+    print_table("Median query time (ms)", ["query", "flat", "star"], rows)
+
+if __name__ == "__main__":
+    main()
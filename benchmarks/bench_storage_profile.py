@@ -0,0 +1,80 @@
+"""
+Storage profile benchmark: read throughput and latency of the read-only
+pool while a writer keeps inserting, for each SQLITE_PROFILES entry.
+Each profile runs against its own copy of the loaded database; the writer
+inserts and removes a 500-row batch every WRITE_INTERVAL seconds.
+"""
+import os
+import tempfile
+import time
+import threading
+from sqlalchemy import text
+
+from app.database import SQLITE_PROFILES, create_db_engine
+from benchmarks.common import copy_database, ensure_loaded, run_concurrent, print_table
+
+READ_QUERY = text("SELECT week_day, SUM(total) FROM sales GROUP BY week_day")
+WRITE_QUERY = text("""
+    INSERT INTO sales_fact (product_id, ticket_id, waiter_id,
+                            quantity, unitary_price, total, iso_date, epoch_day,
+                            year, month, week_of_year, minute_of_day)
+    SELECT product_id, ticket_id, waiter_id,
+           quantity, unitary_price, total, iso_date, epoch_day,
+           year, month, week_of_year, minute_of_day
+    FROM sales_fact LIMIT 500
+""")
+# Keeps the table size constant so both profiles read the same data
+UNDO_QUERY = text("DELETE FROM sales_fact WHERE id > :max_id")
+WRITE_INTERVAL = 0.01
+
+def _bench_profile(db_path: str, profile: str):
+    url = f"sqlite:///{db_path}"
+    writer = create_db_engine(url, profile=profile)
+    reader = create_db_engine(url, read_only=True, profile=profile)
+    # Initialize the file-level settings (journal_mode) before reading
+    with writer.connect() as conn:
+        max_id = conn.execute(text("SELECT MAX(id) FROM sales_fact")).scalar()
+
+    stop = threading.Event()
+    writes = [0]
+
+    def write_loop():
+        while not stop.is_set():
+            with writer.begin() as conn:
+                conn.execute(WRITE_QUERY)
+                conn.execute(UNDO_QUERY, {"max_id": max_id})
+            writes[0] += 1
+            time.sleep(WRITE_INTERVAL)
+
+    def read():
+        with reader.connect() as conn:
+            conn.execute(READ_QUERY).fetchall()
+
+    thread = threading.Thread(target=write_loop)
+    thread.start()
+    try:
+        result = run_concurrent(read, concurrency=8, total=200)
+    finally:
+        stop.set()
+        thread.join()
+        writer.dispose()
+        reader.dispose()
+    return result, writes[0]
+
+def main():
+    ensure_loaded()
+
+    rows = []
+    for profile in SQLITE_PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            copy_database("data.db", db_path)
+            result, writes = _bench_profile(db_path, profile)
+        rows.append([profile, f"{result['qps']:.1f}", f"{result['p50_ms']:.1f}",
+                     f"{result['p99_ms']:.1f}", writes])
+
+    print_table("Reads during concurrent writes (8 readers)",
+                ["profile", "read_qps", "p50_ms", "p99_ms", "write_batches"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Ticket table benchmark: customer and basket questions answered with
+COUNT(DISTINCT ticket_number) over `sales` against the materialized
+`tickets` table.
+"""
+from sqlalchemy import text
+
+from app.database import read_engine
+from benchmarks.common import ensure_loaded, time_call, print_table
+
+# question -> (distinct-count SQL over sales, SQL over tickets)
+QUERIES = {
+    "customers": (
+        "SELECT COUNT(DISTINCT ticket_number) FROM sales",
+        "SELECT COUNT(*) FROM tickets",
+    ),
+    "customers_by_month": (
+        "SELECT month, COUNT(DISTINCT ticket_number) FROM sales GROUP BY month",
+        "SELECT month, COUNT(*) FROM tickets GROUP BY month",
+    ),
+    "customers_by_waiter": (
+        "SELECT waiter, COUNT(DISTINCT ticket_number) FROM sales GROUP BY waiter",
+        "SELECT waiter, COUNT(*) FROM tickets GROUP BY waiter",
+    ),
+    "average_ticket": (
+        "SELECT AVG(t) FROM (SELECT ticket_number, SUM(total) AS t FROM sales GROUP BY ticket_number)",
+        "SELECT AVG(basket_total) FROM tickets",
+    ),
+    "items_per_ticket": (
+        "SELECT SUM(quantity) * 1.0 / COUNT(DISTINCT ticket_number) FROM sales",
+        "SELECT AVG(item_count) FROM tickets",
+    ),
+}
+
+def main():
+    ensure_loaded()
+
+    rows = []
+    with read_engine.connect() as conn:
+        for name, (distinct_sql, tickets_sql) in QUERIES.items():
+            distinct = time_call(lambda: conn.execute(text(distinct_sql)).fetchall()) * 1000
+            tickets = time_call(lambda: conn.execute(text(tickets_sql)).fetchall()) * 1000
+            rows.append([name, f"{distinct:.2f}", f"{tickets:.2f}", f"{distinct / tickets:.1f}x"])
+
+    print_table("Median query time (ms)", ["question", "count_distinct", "tickets", "speedup"], rows)
+
+if __name__ == "__main__":
+    main()
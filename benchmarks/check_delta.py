@@ -0,0 +1,93 @@
+"""
+Delta load check: loads the start of data.csv, whose last line is
+repeated (the same item rung twice on a ticket), then appends the same
+line once more plus further rows and loads again. Exits non-zero unless
+the second load was a delta and the database matches a full load of the
+final file (every repeat kept, same fingerprints). Then rewrites a byte
+before the watermark, keeping the length and the last line, and exits
+non-zero unless that load is a full reload rather than a delta.
+
+    python -m benchmarks.check_delta
+"""
+import os
+import sys
+import tempfile
+
+# The test files must not replace the data.csv snapshot
+os.environ["CSV_SNAPSHOT_ENABLED"] = "false"
+
+from sqlalchemy import text
+
+from app.database import create_db_engine, init_db
+from app.utils.csv_loader import load_csv_to_db
+from benchmarks.common import print_table
+
+LOADED_LINES = 100
+APPENDED_LINES = 50
+
+def _load(db_path: str, csv_path: str) -> str:
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    init_db(engine)
+    result = load_csv_to_db(csv_path, engine=engine)
+    engine.dispose()
+    return result
+
+def _summary(db_path: str):
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        summary = conn.execute(text(
+            "SELECT COUNT(*), SUM(total), COUNT(DISTINCT fingerprint) FROM sales_fact"
+        )).one()
+        fingerprints = set(conn.execute(text("SELECT fingerprint FROM sales_fact")).scalars())
+    engine.dispose()
+    return tuple(summary), fingerprints
+
+def main():
+    with open("data.csv", "rb") as file:
+        header = file.readline()
+        lines = [line if line.endswith(b"\n") else line + b"\n" for line in file]
+    repeated = lines[LOADED_LINES - 1]
+    loaded = lines[:LOADED_LINES] + [repeated]
+    appended = [repeated] + lines[LOADED_LINES:LOADED_LINES + APPENDED_LINES]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "sales.csv")
+        with open(csv_path, "wb") as file:
+            file.write(header + b"".join(loaded))
+        delta_db = os.path.join(tmp, "delta.db")
+        first = _load(delta_db, csv_path)
+        with open(csv_path, "ab") as file:
+            file.write(b"".join(appended))
+        second = _load(delta_db, csv_path)
+
+        full_db = os.path.join(tmp, "full.db")
+        full = _load(full_db, csv_path)
+        (delta_summary, delta_fingerprints), (full_summary, full_fingerprints) = (
+            _summary(delta_db), _summary(full_db)
+        )
+
+        # Same length and same last line, another product name in the first row
+        with open(csv_path, "r+b") as file:
+            content = file.read()
+            row = content[content.index(b"\n") + 1:].split(b"\n", 1)[0]
+            product_start = content.index(row) + len(b",".join(row.split(b",")[:5])) + 1
+            product = row.split(b",")[5]
+            file.seek(product_start)
+            file.write(product.swapcase())
+        rewritten = _load(delta_db, csv_path)
+
+    expected_rows = len(loaded) + len(appended)
+    print_table(f"{len(loaded)} rows loaded, {len(appended)} appended (the first repeats a line loaded twice)",
+                ["database", "loads", "rows", "sum_total", "fingerprints"],
+                [["delta", f"{first}, {second}", *delta_summary],
+                 ["full reload", full, *full_summary]])
+    if (first, second) != ("csv", "delta"):
+        sys.exit(f"FAIL: expected a cold load then a delta, got {first}, {second}")
+    if full_summary[0] != expected_rows or delta_summary != full_summary or delta_fingerprints != full_fingerprints:
+        sys.exit(f"FAIL: the delta load does not match a full load of {expected_rows} rows")
+    if rewritten != "csv":
+        sys.exit(f"FAIL: a rewrite before the watermark was loaded as {rewritten}, expected a full reload")
+    print("OK: the delta load kept the repeat appended after the watermark, and a rewrite reloaded the file")
+
+if __name__ == "__main__":
+    main()
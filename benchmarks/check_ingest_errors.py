@@ -0,0 +1,68 @@
+"""
+POST /ingest validation check: starts the API in-process on a fresh
+SQLite file loaded from data.csv and posts malformed uploads (a
+truncated CSV row, an extra field, an unclosed quote, a row for a
+loaded ticket at another date, invalid or incomplete NDJSON). Exits
+non-zero unless each one is rejected with 400 and leaves the table
+unchanged, and a valid upload is then accepted.
+
+    python -m benchmarks.check_ingest_errors
+"""
+import os
+import sys
+import tempfile
+
+HEADER = "date,week_day,hour,ticket_number,waiter,product_name,quantity,unitary_price,total\n"
+VALID = "11/13/2024,Wednesday,16:55,CHECK-1,0,Alfajor Super DDL x un,1,2700,2700\n"
+NDJSON_VALID = ('{"date": "11/13/2024", "week_day": "Wednesday", "hour": "16:55", "ticket_number": "CHECK-2", '
+                '"waiter": 0, "product_name": "Alfajor", "quantity": 1, "unitary_price": 2700, "total": 2700}\n')
+
+MALFORMED = {
+    "truncated_row": ("text/csv", HEADER + VALID + "11/13/2024,Wednesday,16:55,CHECK-1,0,Alfajor\n"),
+    "extra_field": ("text/csv", HEADER + VALID.rstrip("\n") + ",9\n"),
+    "unclosed_quote": ("text/csv", HEADER + '11/13/2024,Wednesday,16:55,CHECK-1,0,"Alfajor,1,2700,2700\n'
+                       + VALID * 3000),
+    # An already loaded ticket at another date
+    "ticket_conflict": ("text/csv", HEADER + "11/14/2024,Thursday,16:55,FCB 0003-000024735,0,Alfajor,1,2700,2700\n"),
+    "invalid_json": ("application/x-ndjson", NDJSON_VALID + '{"date": "11/13/2024",\n'),
+    "missing_key": ("application/x-ndjson", NDJSON_VALID.replace('"total": 2700', '"total": null')),
+}
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'check.db')}",
+            LOAD_LOCK_PATH=os.path.join(tmp, "check.lock"),
+            CSV_SNAPSHOT_ENABLED="false",
+            OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "unused"),
+        )
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        def sales_rows(client) -> int:
+            response = client.post("/query", json={"sql": "SELECT COUNT(*) AS n FROM (SELECT * FROM sales) s"})
+            response.raise_for_status()
+            return response.json()["data"]["rows"][0][0]
+
+        failures = []
+        with TestClient(app) as client:
+            before = sales_rows(client)
+            for name, (content_type, body) in MALFORMED.items():
+                response = client.post("/ingest", content=body.encode(), headers={"content-type": content_type})
+                print(f"{name:>15}: {response.status_code} {response.json().get('detail')}")
+                if response.status_code != 400:
+                    failures.append(f"{name} returned {response.status_code}")
+            if sales_rows(client) != before:
+                failures.append("a rejected upload stored rows")
+
+            response = client.post("/ingest", content=(HEADER + VALID).encode(), headers={"content-type": "text/csv"})
+            print(f"{'valid':>15}: {response.status_code} {response.json()}")
+            if response.status_code != 200 or sales_rows(client) != before + 1:
+                failures.append(f"the valid upload returned {response.status_code}")
+
+    if failures:
+        sys.exit(f"FAIL: {'; '.join(failures)}")
+    print("OK: malformed uploads are rejected with 400 and store nothing")
+
+if __name__ == "__main__":
+    main()
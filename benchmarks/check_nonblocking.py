@@ -0,0 +1,62 @@
+"""
+Responsiveness check: runs a multi-second /query and polls /health on the
+same app while it executes. Exits non-zero when /health ever takes longer
+than MAX_HEALTH_MS, i.e. when the query blocked the event loop.
+
+    python -m benchmarks.check_nonblocking
+"""
+import os
+import sys
+import time
+import threading
+
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from benchmarks.common import print_table
+
+# Cross join capped by LIMIT: a few seconds of pure SQLite work
+SLOW_QUERY = "SELECT COUNT(*) FROM (SELECT 1 FROM sales_fact a, sales_fact b LIMIT {n})"
+ROWS = 40_000_000
+MAX_HEALTH_MS = 500
+
+def main():
+    with TestClient(app) as client:
+        done = threading.Event()
+        query_time = {}
+
+        def slow_query():
+            start = time.perf_counter()
+            # Distinct SQL per run so the result cache never answers it
+            sql = SLOW_QUERY.format(n=ROWS + int(time.time()) % 1000)
+            client.post("/query", json={"sql": sql}).raise_for_status()
+            query_time["seconds"] = time.perf_counter() - start
+            done.set()
+
+        worker = threading.Thread(target=slow_query)
+        worker.start()
+        time.sleep(0.2)
+
+        latencies = []
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/health").raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+        worker.join()
+
+    if not latencies:
+        sys.exit("Query finished before /health could be polled; raise ROWS")
+    latencies.sort()
+    print_table("/health while a slow query runs",
+                ["query_s", "health_calls", "p50_ms", "max_ms"],
+                [[f"{query_time['seconds']:.2f}", len(latencies),
+                  f"{latencies[len(latencies) // 2]:.1f}", f"{latencies[-1]:.1f}"]])
+    if latencies[-1] > MAX_HEALTH_MS:
+        sys.exit(f"FAIL: /health took {latencies[-1]:.0f}ms while the query ran")
+    print("OK: /health stayed responsive")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Checkpointed load check: writes a scaled copy of data.csv with a few
+invalid rows, starts a checkpointed load in a subprocess and kills it
+(SIGKILL) once a few checkpoints are committed, then runs the load
+again. Exits non-zero unless the second run resumed from the checkpoint
+and the database matches an uninterrupted load, with the invalid rows
+quarantined. Prints the time of each run.
+
+    python -m benchmarks.check_resume [scale]   # default: 10
+"""
+import os
+import sys
+import time
+import signal
+import sqlite3
+import tempfile
+import subprocess
+
+from benchmarks.common import print_table, scaled_csv
+
+BAD_ROWS = [
+    "13/45/2024,Monday,10:00,BAD-1,1,Bad date,1,1,1",
+    "10/1/2024,Tuesday,10:00,BAD-2,1,Bad quantity,one,1,1",
+    "10/1/2024,Tuesday,10:00,BAD-3,1,Missing columns",
+]
+CHECKPOINT_BATCHES = 10
+KILL_AFTER_BATCHES = 60
+
+CHILD = """
+from app.database import init_db
+from app.utils.csv_loader import load_csv_to_db
+init_db()
+print("RESULT", load_csv_to_db({csv_path!r}))
+"""
+
+def _scaled_with_bad_rows(path: str, factor: int) -> int:
+    """Scaled data.csv with BAD_ROWS spread through it; returns the valid rows."""
+    row_count = scaled_csv(path, factor)
+    with open(path, "rb") as file:
+        header = file.readline()
+        lines = file.readlines()
+    step = len(lines) // (len(BAD_ROWS) + 1)
+    for index, bad_row in enumerate(BAD_ROWS, 1):
+        lines.insert(index * step + index - 1, (bad_row + "\n").encode())
+    with open(path, "wb") as file:
+        file.write(header)
+        file.writelines(lines)
+    return row_count
+
+def _run(csv_path: str, db_path: str, checkpoint: bool, kill_after: int = 0):
+    """Runs a load in a subprocess; returns (result, seconds)."""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        CSV_SNAPSHOT_ENABLED="false",
+        CSV_CHECKPOINT_BATCHES=str(CHECKPOINT_BATCHES) if checkpoint else "0",
+        PYTHONPATH=os.getcwd(),
+    )
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-c", CHILD.format(csv_path=csv_path)], env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if kill_after:
+        while child.poll() is None and _checkpointed_batches(db_path) < kill_after:
+            time.sleep(0.05)
+        child.send_signal(signal.SIGKILL)
+    output, _ = child.communicate(timeout=600)
+    seconds = time.perf_counter() - start
+    lines = [line for line in output.splitlines() if line.startswith("RESULT ")]
+    return (lines[-1].split()[1] if child.returncode == 0 and lines else f"exit {child.returncode}"), seconds
+
+def _checkpointed_batches(db_path: str) -> int:
+    try:
+        connection = sqlite3.connect(db_path, timeout=1)
+        try:
+            row = connection.execute("SELECT MAX(batch_id) FROM ingest_progress").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.OperationalError:
+        return 0  # not created yet
+    return row[0] or 0
+
+def _summary(db_path: str):
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(
+            "SELECT (SELECT COUNT(*) FROM sales_fact), (SELECT COUNT(DISTINCT fingerprint) FROM sales_fact), "
+            "(SELECT SUM(total) FROM sales_fact), (SELECT COUNT(*) FROM quarantined_rows), "
+            "(SELECT COUNT(*) FROM ingest_progress)"
+        ).fetchone()
+    finally:
+        connection.close()
+
+def main():
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "scaled.csv")
+        row_count = _scaled_with_bad_rows(csv_path, factor)
+
+        straight_db = os.path.join(tmp, "straight.db")
+        straight, straight_s = _run(csv_path, straight_db, checkpoint=True)
+        killed_db = os.path.join(tmp, "killed.db")
+        killed, killed_s = _run(csv_path, killed_db, checkpoint=True, kill_after=KILL_AFTER_BATCHES)
+        checkpoint = _checkpointed_batches(killed_db)
+        resumed, resumed_s = _run(csv_path, killed_db, checkpoint=True)
+
+        expected = (row_count, row_count, _summary(straight_db)[2], len(BAD_ROWS), 0)
+        results = [["uninterrupted", straight, f"{straight_s:.2f}", *_summary(straight_db)],
+                   ["killed", killed, f"{killed_s:.2f}", "", "", "", "", checkpoint],
+                   ["restarted", resumed, f"{resumed_s:.2f}", *_summary(killed_db)]]
+
+    print_table(f"Checkpointed load of {row_count} rows + {len(BAD_ROWS)} invalid, "
+                f"checkpoint every {CHECKPOINT_BATCHES} batches",
+                ["run", "result", "seconds", "fact_rows", "fingerprints", "sum_total", "quarantined",
+                 "checkpoint_batches"], results)
+    if straight != "csv" or _summary_failed(results[0][3:], expected):
+        sys.exit(f"FAIL: uninterrupted load returned {straight}, expected {expected}")
+    if not killed.startswith("exit") or not checkpoint:
+        sys.exit(f"FAIL: the load was not killed after a checkpoint ({killed}, batch {checkpoint})")
+    if resumed != "resumed" or _summary_failed(results[2][3:], expected):
+        sys.exit(f"FAIL: restarted load returned {resumed}, expected {expected}")
+    print("OK: the restarted load resumed from its checkpoint and matches an uninterrupted load")
+
+def _summary_failed(summary, expected) -> bool:
+    return tuple(summary) != expected
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Startup coordination check: starts WORKERS processes at once against a
+fresh SQLite file, each running the lifespan's coordinated_load, and
+exits non-zero unless exactly one of them loaded the CSV, the others
+reported "ready", and the table holds the file's rows exactly once.
+
+    python -m benchmarks.check_single_load
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import subprocess
+
+from benchmarks.common import print_table
+
+WORKERS = 4
+CSV_PATH = "data.csv"
+
+CHILD = """
+from app.utils.load_coordinator import coordinated_load
+print("RESULT", coordinated_load({csv_path!r}))
+"""
+
+def main():
+    with open(CSV_PATH, "rb") as file:
+        csv_rows = sum(1 for _ in file) - 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "check.db")
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{db_path}",
+            CSV_SNAPSHOT_ENABLED="false",
+            PYTHONPATH=os.getcwd(),
+        )
+        env.pop("LOAD_LOCK_PATH", None)
+        workers = [
+            subprocess.Popen([sys.executable, "-c", CHILD.format(csv_path=CSV_PATH)], env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            for _ in range(WORKERS)
+        ]
+        results = []
+        for worker in workers:
+            output, _ = worker.communicate(timeout=600)
+            lines = [line for line in output.splitlines() if line.startswith("RESULT ")]
+            results.append(lines[-1].split()[1] if worker.returncode == 0 and lines else f"exit {worker.returncode}")
+
+        connection = sqlite3.connect(db_path)
+        try:
+            fact_rows = connection.execute("SELECT COUNT(*) FROM sales_fact").fetchone()[0]
+            data_version = connection.execute(
+                "SELECT value FROM ingest_meta WHERE key = 'data_version'"
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+    loads = [result for result in results if result in ("csv", "snapshot")]
+    print_table(f"{WORKERS} workers starting together",
+                ["results", "fact_rows", "csv_rows", "data_version"],
+                [[" ".join(results), fact_rows, csv_rows, data_version]])
+    if len(loads) != 1 or results.count("ready") != WORKERS - 1:
+        sys.exit(f"FAIL: expected one load and {WORKERS - 1} ready workers, got {results}")
+    if fact_rows != csv_rows or data_version != "1":
+        sys.exit(f"FAIL: {fact_rows} fact rows (expected {csv_rows}), data_version {data_version}")
+    print("OK: exactly one worker loaded the data")
+
+if __name__ == "__main__":
+    main()
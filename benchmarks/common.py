@@ -0,0 +1,82 @@
+"""
+Shared helpers for the benchmark scripts.
+Run them from the repository root, e.g. `python -m benchmarks.bench_pool`.
+"""
+import time
+import sqlite3
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+def ensure_loaded(csv_path: str = "data.csv"):
+    """Creates the schema and loads the CSV into DATABASE_URL if empty."""
+    from app.database import init_db
+    from app.utils.csv_loader import load_csv_to_db
+    init_db()
+    load_csv_to_db(csv_path)
+
+def copy_database(src_path: str, dst_path: str):
+    """Copies a SQLite database consistently (including WAL contents)."""
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+def scaled_csv(path: str, factor: int, source: str = "data.csv") -> int:
+    """Writes the source CSV's rows `factor` times; returns the row count."""
+    with open(source, "rb") as file:
+        header = file.readline()
+        body = file.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    with open(path, "wb") as target:
+        target.write(header)
+        for _ in range(factor):
+            target.write(body)
+    return body.count(b"\n") * factor
+
+def time_call(func: Callable, repeat: int = 5) -> float:
+    """Returns the median wall time (seconds) of `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def run_concurrent(func: Callable, concurrency: int, total: int) -> Dict[str, float]:
+    """
+    Runs `func` `total` times across `concurrency` threads.
+    Returns throughput and latency percentiles in milliseconds.
+    """
+    latencies: List[float] = []
+
+    def timed():
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(timed) for _ in range(total)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "qps": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+def print_table(title: str, header: List[str], rows: List[List]):
+    """Prints a small fixed-width table."""
+    print(f"\n{title}")
+    widths = [max(len(str(c)) for c in col) for col in zip(header, *rows)]
+    fmt = "  ".join(f"{{:>{w}}}" for w in widths)
+    print(fmt.format(*header))
+    for row in rows:
+        print(fmt.format(*row))